@@ -0,0 +1,370 @@
+"""
+In-process mock JSON-RPC node for benchmarks.
+
+Answers the calls eth_async makes (balances, eth_call incl. Multicall3 aggregate3, fees, gas estimates,
+sending raw transactions, receipts), mines pending transactions every `block_time` seconds and counts every
+HTTP request and JSON-RPC call it serves. `/ws` is a WebSocket endpoint with eth_subscribe for newHeads.
+"""
+import json
+import random
+import asyncio
+from collections import Counter
+
+import rlp
+from aiohttp import web, WSMsgType
+from hexbytes import HexBytes
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_account._utils.typed_transactions import TypedTransaction
+from eth_utils import keccak, function_signature_to_4byte_selector
+
+from eth_async.models import MULTICALL3_ADDRESS
+
+
+GWEI = 10 ** 9
+
+AGGREGATE3 = function_signature_to_4byte_selector('aggregate3((address,bool,bytes)[])')
+TRANSFER_TOPIC = '0x' + keccak(text='Transfer(address,address,uint256)').hex()
+TOKEN_ADDRESS = '0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48'
+
+
+def get_amounts_out(args: bytes) -> bytes:
+    # курс 2000 USDC (6 decimals) за 1 ETH (18 decimals) на каждом шаге пути
+    amount_in, path = decode(['uint256', 'address[]'], args)
+    amounts = [amount_in]
+    for _ in path[1:]:
+        amounts.append(amounts[-1] * 2000 // 10 ** 12)
+    return encode(['uint256[]'], [amounts])
+
+
+# ответы на eth_call по селектору функции
+CALL_RESULTS = {
+    function_signature_to_4byte_selector('decimals()'): lambda args: encode(['uint8'], [18]),
+    function_signature_to_4byte_selector('symbol()'): lambda args: encode(['string'], ['MOCK']),
+    function_signature_to_4byte_selector('name()'): lambda args: encode(['string'], ['Mock Token']),
+    function_signature_to_4byte_selector('balanceOf(address)'): lambda args: encode(['uint256'], [10 ** 21]),
+    function_signature_to_4byte_selector('allowance(address,address)'): lambda args: encode(['uint256'], [0]),
+    function_signature_to_4byte_selector('getAmountsOut(uint256,address[])'): get_amounts_out,
+}
+
+
+def to_hex(value: int) -> str:
+    return hex(value)
+
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class MockNode:
+    """
+    :param latency: seconds added to every HTTP request (a batch pays it once).
+    :param jitter: random extra latency up to this many seconds.
+    :param error_rate: share of JSON-RPC calls answered with a retryable error.
+    :param batch: whether JSON-RPC batch arrays are supported.
+    :param block_receipts: whether eth_getBlockReceipts is supported.
+    :param block_time: seconds between mined blocks.
+    :param logs_per_block: synthetic ERC-20 Transfer logs in every block for eth_getLogs.
+    :param max_logs: eth_getLogs fails with "query returned more than N results" above this.
+    """
+
+    def __init__(self,
+                 chain_id: int = 1337,
+                 latency: float = 0.02,
+                 jitter: float = 0,
+                 error_rate: float = 0,
+                 batch: bool = True,
+                 block_receipts: bool = True,
+                 block_time: float = 0.2,
+                 logs_per_block: int = 0,
+                 max_logs: int = 10_000) -> None:
+        self.chain_id = chain_id
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.batch = batch
+        self.block_receipts = block_receipts
+        self.block_time = block_time
+        self.logs_per_block = logs_per_block
+        self.max_logs = max_logs
+
+        self.http_requests = 0
+        self.calls: Counter = Counter()
+        self.block_number = 1
+        self.nonces: dict[str, int] = {}
+        self.mempool: list[dict] = []
+        self.blocks: dict[int, list[dict]] = {}
+        self.receipts: dict[str, dict] = {}
+
+        self._runner: web.AppRunner | None = None
+        self._miner: asyncio.Task | None = None
+        self._sockets: dict[web.WebSocketResponse, dict[str, str]] = {}  # соединение -> {id подписки: тип}
+        self.url: str | None = None
+        self.ws_url: str | None = None
+
+    @property
+    def rpc_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def reset_stats(self) -> None:
+        self.http_requests = 0
+        self.calls.clear()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post('/', self._handle)
+        app.router.add_get('/ws', self._handle_ws)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f'http://{host}:{port}/'
+        self.ws_url = f'ws://{host}:{port}/ws'
+        self._miner = asyncio.create_task(self._mine())
+        return self.url
+
+    async def drop_websockets(self) -> None:
+        """Close every WebSocket connection, as a node restart would."""
+        for ws in list(self._sockets):
+            await ws.close()
+
+    async def stop(self) -> None:
+        await self.drop_websockets()
+        if self._miner:
+            self._miner.cancel()
+            await asyncio.gather(self._miner, return_exceptions=True)
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def __aenter__(self) -> 'MockNode':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        payload = json.loads(await request.read())
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if isinstance(payload, list):
+            if not self.batch:
+                return web.json_response(
+                    {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'batch is not supported'}})
+            return web.json_response([self._call(item) for item in payload])
+        return web.json_response(self._call(payload))
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscriptions = self._sockets[ws] = {}
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(message.data)
+                method, params = payload.get('method'), payload.get('params', [])
+                if method == 'eth_subscribe':
+                    self.calls[method] += 1
+                    subscription_id = hex(random.getrandbits(64))
+                    subscriptions[subscription_id] = params[0]
+                    response = {'jsonrpc': '2.0', 'id': payload.get('id'), 'result': subscription_id}
+                elif method == 'eth_unsubscribe':
+                    self.calls[method] += 1
+                    response = {'jsonrpc': '2.0', 'id': payload.get('id'),
+                                'result': subscriptions.pop(params[0], None) is not None}
+                else:
+                    response = self._call(payload)
+                await ws.send_json(response)
+        finally:
+            self._sockets.pop(ws, None)
+        return ws
+
+    async def _notify_heads(self) -> None:
+        head = self._rpc_eth_getBlockByNumber(to_hex(self.block_number))
+        for ws, subscriptions in list(self._sockets.items()):
+            for subscription_id, kind in list(subscriptions.items()):
+                if kind != 'newHeads':
+                    continue
+                message = {'jsonrpc': '2.0', 'method': 'eth_subscription',
+                           'params': {'subscription': subscription_id, 'result': head}}
+                try:
+                    await ws.send_json(message)
+                except Exception:
+                    pass
+
+    def _call(self, request: dict) -> dict:
+        method = request.get('method')
+        self.calls[method] += 1
+        response = {'jsonrpc': '2.0', 'id': request.get('id')}
+        try:
+            if self.error_rate and random.random() < self.error_rate:
+                raise RPCError(-32005, 'request rate exceeded')
+            handler = getattr(self, f'_rpc_{method}', None)
+            if not handler:
+                raise RPCError(-32601, f'the method {method} does not exist')
+            response['result'] = handler(*request.get('params', []))
+        except RPCError as err:
+            response['error'] = {'code': err.code, 'message': err.message}
+        return response
+
+    async def _mine(self) -> None:
+        while True:
+            await asyncio.sleep(self.block_time)
+            self.block_number += 1
+            block_hash = '0x' + keccak(self.block_number.to_bytes(32, 'big')).hex()
+            receipts = []
+            for index, tx in enumerate(self.mempool):
+                receipt = {
+                    'blockHash': block_hash,
+                    'blockNumber': to_hex(self.block_number),
+                    'contractAddress': None,
+                    'cumulativeGasUsed': to_hex(21000 * (index + 1)),
+                    'effectiveGasPrice': to_hex(GWEI),
+                    'from': tx['from'],
+                    'gasUsed': to_hex(21000),
+                    'logs': [],
+                    'logsBloom': '0x' + '00' * 256,
+                    'status': '0x1',
+                    'to': tx['to'],
+                    'transactionHash': tx['hash'],
+                    'transactionIndex': to_hex(index),
+                    'type': '0x2',
+                }
+                receipts.append(receipt)
+                self.receipts[tx['hash']] = receipt
+                self.nonces[tx['from'].lower()] = self.nonces.get(tx['from'].lower(), 0) + 1
+            self.blocks[self.block_number] = receipts
+            self.mempool = []
+            await self._notify_heads()
+
+    def _rpc_eth_chainId(self) -> str:
+        return to_hex(self.chain_id)
+
+    def _rpc_net_version(self) -> str:
+        return str(self.chain_id)
+
+    def _rpc_eth_blockNumber(self) -> str:
+        return to_hex(self.block_number)
+
+    def _rpc_eth_getBalance(self, address: str, block: str = 'latest') -> str:
+        return to_hex(10 ** 18)
+
+    def _rpc_eth_getTransactionCount(self, address: str, block: str = 'latest') -> str:
+        nonce = self.nonces.get(address.lower(), 0)
+        if block == 'pending':
+            nonce += sum(1 for tx in self.mempool if tx['from'].lower() == address.lower())
+        return to_hex(nonce)
+
+    def _rpc_eth_gasPrice(self) -> str:
+        return to_hex(GWEI)
+
+    def _rpc_eth_maxPriorityFeePerGas(self) -> str:
+        return to_hex(GWEI // 10)
+
+    def _rpc_eth_feeHistory(self, block_count: str | int, newest_block: str, percentiles: list | None = None) -> dict:
+        block_count = int(block_count, 16) if isinstance(block_count, str) else block_count
+        return {
+            'oldestBlock': to_hex(max(self.block_number - block_count + 1, 0)),
+            'baseFeePerGas': [to_hex(GWEI)] * (block_count + 1),
+            'gasUsedRatio': [0.5] * block_count,
+            'reward': [[to_hex(GWEI // 10) for _ in percentiles or []] for _ in range(block_count)],
+        }
+
+    def _rpc_eth_estimateGas(self, tx: dict, block: str = 'latest') -> str:
+        return to_hex(21000 if not tx.get('data') else 150_000)
+
+    def _rpc_eth_getCode(self, address: str, block: str = 'latest') -> str:
+        return '0x'
+
+    def _rpc_eth_call(self, tx: dict, block: str = 'latest') -> str:
+        data = bytes.fromhex(tx.get('data', tx.get('input', '0x'))[2:])
+        if (tx.get('to') or '').lower() == MULTICALL3_ADDRESS.lower() and data[:4] == AGGREGATE3:
+            calls = decode(['(address,bool,bytes)[]'], data[4:])[0]
+            results = [(True, self._call_result(call_data)) for _, _, call_data in calls]
+            return '0x' + encode(['(bool,bytes)[]'], [results]).hex()
+        return '0x' + self._call_result(data).hex()
+
+    @staticmethod
+    def _call_result(data: bytes) -> bytes:
+        result = CALL_RESULTS.get(data[:4])
+        return result(data[4:]) if result else encode(['uint256'], [0])
+
+    def _rpc_eth_sendRawTransaction(self, raw: str) -> str:
+        raw = HexBytes(raw)
+        if raw[0] <= 0x7f:
+            tx = TypedTransaction.from_bytes(raw).as_dict()
+            nonce, to = tx['nonce'], tx['to']
+        else:
+            fields = rlp.decode(raw)
+            nonce, to = int.from_bytes(fields[0], 'big'), fields[3]
+        sender = Account.recover_transaction(raw)
+
+        expected = int(self._rpc_eth_getTransactionCount(sender, 'pending'), 16)
+        if nonce < expected:
+            raise RPCError(-32000, 'nonce too low')
+        if nonce > expected:
+            raise RPCError(-32000, 'nonce too high')
+
+        tx_hash = '0x' + keccak(raw).hex()
+        to = '0x' + bytes(to).hex() if to else None
+        self.mempool.append({'hash': tx_hash, 'from': sender, 'to': to})
+        return tx_hash
+
+    def _rpc_eth_getTransactionReceipt(self, tx_hash: str) -> dict | None:
+        return self.receipts.get(tx_hash.lower())
+
+    def _rpc_eth_getBlockReceipts(self, block: str) -> list[dict]:
+        if not self.block_receipts:
+            raise RPCError(-32601, 'the method eth_getBlockReceipts does not exist')
+        number = self.block_number if block in ('latest', 'pending') else int(block, 16)
+        return self.blocks.get(number, [])
+
+    def _rpc_eth_getLogs(self, log_filter: dict) -> list[dict]:
+        first = int(log_filter.get('fromBlock', '0x0'), 16)
+        last = log_filter.get('toBlock', 'latest')
+        last = self.block_number if last in ('latest', 'pending') else int(last, 16)
+        topics = log_filter.get('topics') or []
+        topic0 = topics[0] if topics else None
+        if topic0 and TRANSFER_TOPIC not in (topic0 if isinstance(topic0, list) else [topic0]):
+            return []
+        if (last - first + 1) * self.logs_per_block > self.max_logs:
+            raise RPCError(-32005, f'query returned more than {self.max_logs} results')
+
+        address = log_filter.get('address') or TOKEN_ADDRESS
+        address = address[0] if isinstance(address, list) else address
+        logs = []
+        for number in range(first, last + 1):
+            block_hash = '0x' + keccak(number.to_bytes(32, 'big')).hex()
+            for index in range(self.logs_per_block):
+                logs.append({
+                    'address': address,
+                    'blockHash': block_hash,
+                    'blockNumber': to_hex(number),
+                    'data': '0x' + encode(['uint256'], [number * 1000 + index]).hex(),
+                    'logIndex': to_hex(index),
+                    'removed': False,
+                    'topics': [TRANSFER_TOPIC, '0x' + '00' * 12 + '11' * 20, '0x' + '00' * 12 + '22' * 20],
+                    'transactionHash': '0x' + keccak(f'{number}:{index}'.encode()).hex(),
+                    'transactionIndex': to_hex(index),
+                })
+        return logs
+
+    def _rpc_eth_getBlockByNumber(self, block: str, full: bool = False) -> dict:
+        number = self.block_number if block in ('latest', 'pending') else int(block, 16)
+        return {
+            'number': to_hex(number),
+            'hash': '0x' + keccak(number.to_bytes(32, 'big')).hex(),
+            'parentHash': '0x' + keccak((number - 1).to_bytes(32, 'big')).hex(),
+            'timestamp': to_hex(1_700_000_000 + number),
+            'baseFeePerGas': to_hex(GWEI),
+            'gasLimit': to_hex(30_000_000),
+            'gasUsed': to_hex(15_000_000),
+            'miner': '0x' + '00' * 20,
+            'transactions': [receipt['transactionHash'] for receipt in self.blocks.get(number, [])],
+        }
@@ -0,0 +1,210 @@
+"""
+eth_async scenarios against the in-process mock node.
+
+    python -m benchmarks.rpc --wallets 200 --concurrency 50 --latency 0.02
+    python -m benchmarks.rpc --scenario receipts --no-block-receipts --error-rate 0.01
+
+For every scenario prints throughput (items per second), p50/p99 latency of one operation, and how many
+JSON-RPC calls and HTTP requests the node served per item.
+"""
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Awaitable, Callable
+
+from eth_abi import encode
+from eth_account import Account
+from eth_utils import function_signature_to_4byte_selector
+
+from eth_async.client import Client
+from eth_async.logs import LogScanner
+from eth_async.models import Network, TokenAmount
+
+from .mock_node import MockNode
+
+
+TOKEN = '0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48'
+ROUTER = '0x8B791913eB07C32779a16750e3868aA8495F5964'
+SWAP_SELECTOR = function_signature_to_4byte_selector('swapExactTokensForETH(uint256,uint256,address[],address,uint256)')
+
+SCENARIOS: dict[str, Callable] = {}
+
+
+def scenario(name: str):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+class Context:
+    def __init__(self, node: MockNode, network: Network, wallets: int) -> None:
+        self.node = node
+        self.network = network
+        self.keys = [Account.create().key.hex() for _ in range(wallets)]
+        self.addresses = [Account.from_key(key).address for key in self.keys]
+        self._clients: dict[int, Client] = {}
+
+    def client(self, index: int) -> Client:
+        if index not in self._clients:
+            self._clients[index] = Client(private_key=self.keys[index], network=self.network, check_proxy=False)
+        return self._clients[index]
+
+
+# каждый сценарий возвращает список операций, операция возвращает число обработанных элементов
+
+@scenario('balance_sweep')
+def balance_sweep(ctx: Context) -> list[Callable[[], Awaitable[int]]]:
+    async def sweep(addresses: list[str]) -> int:
+        return len(await ctx.client(0).wallet.balances(addresses, as_array=True))
+
+    return [
+        lambda chunk=ctx.addresses[i:i + 100]: sweep(chunk)
+        for i in range(0, len(ctx.addresses), 100)
+    ]
+
+
+@scenario('token_balances')
+def token_balances(ctx: Context) -> list[Callable[[], Awaitable[int]]]:
+    async def balance(index: int) -> int:
+        await ctx.client(index).wallet.balance(token_address=TOKEN)
+        return 1
+
+    return [lambda index=index: balance(index) for index in range(len(ctx.keys))]
+
+
+@scenario('approve_swap')
+def approve_swap(ctx: Context) -> list[Callable[[], Awaitable[int]]]:
+    async def flow(index: int) -> int:
+        client = ctx.client(index)
+        amount = TokenAmount(amount=10)
+        if await client.transactions.approved_amount(token=TOKEN, spender=ROUTER) < amount:
+            await client.transactions.approve(token=TOKEN, spender=ROUTER, amount=amount)
+
+        data = SWAP_SELECTOR + encode(
+            ['uint256', 'uint256', 'address[]', 'address', 'uint256'],
+            [amount.Wei, 0, [TOKEN, client.account.address], client.account.address, int(time.time()) + 600]
+        )
+        tx = await client.transactions.sign_and_send(tx_params={'to': ROUTER, 'data': '0x' + data.hex()})
+        await tx.wait_for_receipt(client=client, timeout=60)
+        return 1
+
+    return [lambda index=index: flow(index) for index in range(len(ctx.keys))]
+
+
+@scenario('receipts')
+def receipts(ctx: Context) -> list[Callable[[], Awaitable[int]]]:
+    async def send(index: int) -> int:
+        client = ctx.client(index)
+        tx = await client.transactions.sign_and_send(
+            tx_params={'to': client.account.address, 'value': TokenAmount(amount=0.001).Wei})
+        await tx.wait_for_receipt(client=client, timeout=60)
+        return 1
+
+    return [lambda index=index: send(index) for index in range(len(ctx.keys))]
+
+
+@scenario('log_scan')
+def log_scan(ctx: Context) -> list[Callable[[], Awaitable[int]]]:
+    # по 5 Transfer в каждом из `wallets * 50` блоков, нода отдает не больше 10000 логов за запрос
+    ctx.node.logs_per_block = 5
+    ctx.node.block_number = max(ctx.node.block_number, len(ctx.keys) * 50)
+
+    async def scan() -> int:
+        scanner = LogScanner(client=ctx.client(0), contract=TOKEN, events=['Transfer'])
+        return sum([1 async for _ in scanner.scan(from_block=1, to_block=len(ctx.keys) * 50)])
+
+    return [scan]
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[int(q) - 1]
+
+
+async def run_scenario(name: str, wallets: int, concurrency: int, **node_options) -> dict:
+    async with MockNode(**node_options) as node:
+        network = Network(name=f'mock_{name}', rpc=node.url, chain_id=node.chain_id, tx_type=2, coin_symbol='ETH')
+        ctx = Context(node=node, network=network, wallets=wallets)
+        operations = SCENARIOS[name](ctx)
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = []
+
+        async def timed(operation) -> int:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    items = await operation()
+                except Exception as err:
+                    errors.append(err)
+                    return 0
+                latencies.append(time.perf_counter() - started)
+                return items
+
+        started = time.perf_counter()
+        items = sum(await asyncio.gather(*(timed(operation) for operation in operations)))
+        elapsed = time.perf_counter() - started
+        await Client.close_all()
+
+        return {
+            'scenario': name,
+            'items': items,
+            'errors': len(errors),
+            'first_error': repr(errors[0]) if errors else None,
+            'throughput': items / elapsed if elapsed else 0,
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+            'rpc_per_item': node.rpc_calls / items if items else 0,
+            'http_per_item': node.http_requests / items if items else 0,
+            'calls': dict(node.calls.most_common()),
+        }
+
+
+def print_report(report: dict, verbose: bool = False) -> None:
+    print(f"{report['scenario']:<15} {report['items']:>6} items {report['throughput']:>9.1f}/s "
+          f"p50 {report['p50'] * 1000:>7.1f} ms  p99 {report['p99'] * 1000:>7.1f} ms  "
+          f"rpc/item {report['rpc_per_item']:>5.2f}  http/item {report['http_per_item']:>5.2f}  "
+          f"errors {report['errors']}")
+    if report['first_error']:
+        print(f"{'':<15} first error: {report['first_error']}")
+    if verbose:
+        for method, count in report['calls'].items():
+            print(f"{'':<15} {method:<32} {count}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenario', choices=list(SCENARIOS), action='append')
+    parser.add_argument('--wallets', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--block-time', type=float, default=0.2)
+    parser.add_argument('--no-batch', action='store_true')
+    parser.add_argument('--no-block-receipts', action='store_true')
+    parser.add_argument('--verbose', action='store_true', help='print calls per JSON-RPC method')
+    args = parser.parse_args()
+
+    for name in args.scenario or SCENARIOS:
+        report = await run_scenario(
+            name=name,
+            wallets=args.wallets,
+            concurrency=args.concurrency,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            block_time=args.block_time,
+            batch=not args.no_batch,
+            block_receipts=not args.no_block_receipts,
+        )
+        print_report(report, verbose=args.verbose)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Throughput of SigningService against signing on the event loop.
+
+    python -m benchmarks.signing --count 5000 --workers 4 --chunk-size 64
+"""
+import time
+import asyncio
+import argparse
+
+from eth_account import Account
+
+from eth_async.signing import SigningService
+
+
+def make_jobs(count: int, wallets: int = 100) -> list[tuple[bytes, dict]]:
+    keys = [Account.create().key for _ in range(wallets)]
+    return [
+        (keys[i % wallets], {
+            'chainId': 324,
+            'nonce': i // wallets,
+            'to': '0x8B791913eB07C32779a16750e3868aA8495F5964',
+            'value': 10 ** 15,
+            'data': '0x7ff36ab5' + '00' * 128,
+            'gas': 250_000,
+            'maxFeePerGas': 250_000_000,
+            'maxPriorityFeePerGas': 0,
+        })
+        for i in range(count)
+    ]
+
+
+async def heartbeat(stop: asyncio.Event) -> float:
+    """The worst delay of a 1 ms timer, i.e. how long the event loop was blocked."""
+    worst = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, time.perf_counter() - started - 0.001)
+    return worst
+
+
+async def measure(title: str, sign, jobs: list) -> None:
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    signed = await sign(jobs)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    worst_block = await beat
+    assert len(signed) == len(jobs)
+    print(f'{title:<12} {len(jobs) / elapsed:>10.0f} tx/s  {elapsed:>7.2f} s  loop blocked up to {worst_block * 1000:.0f} ms')
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=64)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.count)
+    SigningService.configure(max_workers=args.workers, chunk_size=args.chunk_size, min_pool_size=0)
+
+    async def inline(jobs):
+        return [Account.sign_transaction(tx, key) for key, tx in jobs]
+
+    await SigningService.sign_many(jobs[:1])  # прогрев пула
+    await measure('event loop', inline, jobs)
+    await measure('process pool', SigningService.sign_many, jobs)
+
+    inline_signed = await inline(jobs[:100])
+    pool_signed = await SigningService.sign_many(jobs[:100])
+    assert [tx.rawTransaction for tx in inline_signed] == [tx.rawTransaction for tx in pool_signed]
+    SigningService.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
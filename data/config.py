@@ -11,3 +11,7 @@ else:
     ROOT_DIR = Path(__file__).parent.parent.absolute()
 
 ABIS_DIR = os.path.join(ROOT_DIR, 'data', 'abis')
+TOKENS_CACHE_PATH = os.path.join(ROOT_DIR, 'data', 'tokens.json')
+CHAINS_CACHE_PATH = os.path.join(ROOT_DIR, 'data', 'chains.json')
+SIGNATURES_INDEX_PATH = os.path.join(ROOT_DIR, 'data', 'signatures.idx')
+KEYSTORE_PATH = os.path.join(ROOT_DIR, 'data', 'keys.ks')
@@ -1,43 +1,60 @@
+import os
 
-from eth_async.utils.utils import read_json
 from eth_async.models import RawContract, DefaultABIs
 from eth_async.classes import Singleton
+from eth_async.tokens import TokenCache
+from eth_async.utils.chains import ChainList
+from eth_async.signatures import SignatureDatabase
 
-from data.config import ABIS_DIR
+from data.config import ABIS_DIR, TOKENS_CACHE_PATH, CHAINS_CACHE_PATH, SIGNATURES_INDEX_PATH
 
 
 class Contracts(Singleton):
     ETHEREUM_SHIBASWAP = RawContract(
         title="ShibaSwap",
         address="0x03f7724180AA6b939894B5Ca4314783B0b36b329",
-        abi=read_json(path=(ABIS_DIR, "shiba.json"))
+        abi=os.path.join(ABIS_DIR, "shiba.json")
     )
 
     ETHEREUM_USDC = RawContract(
         title="USDC",
         address="0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",
-        abi=DefaultABIs.Token
+        abi=DefaultABIs.Token,
+        chain_id=1,
+        decimals=6
     )
     ETHEREUM_ETH = RawContract(
         title="ETH",
         address="0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
-        abi=DefaultABIs.Token
+        abi=DefaultABIs.Token,
+        chain_id=1,
+        decimals=18
     )
 
     ZKSYNC_MUTE = RawContract(
         title="mute",
         address="0x8B791913eB07C32779a16750e3868aA8495F5964",
-        abi=read_json(path=(ABIS_DIR, 'mute.json'))
+        abi=os.path.join(ABIS_DIR, 'mute.json')
     )
 
     ZKSYNC_WETH = RawContract(
         title='USDC',
         address='0x5AEa5775959fBC2557Cc8789bC1bf90A239D9a91',
-        abi=read_json(path=(ABIS_DIR, 'WETH.json'))
+        abi=os.path.join(ABIS_DIR, 'WETH.json'),
+        chain_id=324,
+        decimals=18
     )
 
     ZKSYNC_USDC = RawContract(
         title='USDC',
         address='0x3355df6D4c9C3035724Fd0e3914dE96A5a83aaf4',
-        abi=DefaultABIs.Token
+        abi=DefaultABIs.Token,
+        chain_id=324,
+        decimals=6
     )
+
+
+ChainList.configure(path=CHAINS_CACHE_PATH)
+TokenCache.configure(path=TOKENS_CACHE_PATH)
+SignatureDatabase.configure(index_path=SIGNATURES_INDEX_PATH)
+TokenCache.seed(Contracts)
@@ -0,0 +1,42 @@
+import json
+import hashlib
+
+from .utils.utils import read_json
+
+
+class ABIRegistry:
+    """
+    Parses ABIs lazily and dedups identical ones by hash.
+
+    An ABI may be passed as a parsed list, a JSON string or a path to a JSON file. Files are read on first use.
+    """
+    _abis: dict[str, list] = {}  # hash -> abi
+    _lists: dict[int, tuple[list, str]] = {}  # id(list) -> (list, hash), список храним, чтобы id не переиспользовался
+    _strings: dict[str, str] = {}  # json string or path -> hash
+
+    @classmethod
+    def load(cls, abi: list | str) -> tuple[str, list]:
+        """
+        Get the ABI and its hash.
+
+        :return tuple[str, list]: the hash and the parsed ABI, the same list object for identical ABIs.
+        """
+        if isinstance(abi, list):
+            known = cls._lists.get(id(abi))
+            if known:
+                return known[1], cls._abis[known[1]]
+            abi_hash = cls._register(abi)
+            cls._lists[id(abi)] = (abi, abi_hash)
+            return abi_hash, cls._abis[abi_hash]
+
+        abi_hash = cls._strings.get(abi)
+        if not abi_hash:
+            parsed = json.loads(abi) if abi.lstrip().startswith('[') else read_json(path=abi)
+            abi_hash = cls._strings[abi] = cls._register(parsed)
+        return abi_hash, cls._abis[abi_hash]
+
+    @classmethod
+    def _register(cls, abi: list) -> str:
+        abi_hash = hashlib.sha1(json.dumps(abi, sort_keys=True).encode()).hexdigest()
+        cls._abis.setdefault(abi_hash, abi)
+        return abi_hash
@@ -0,0 +1,192 @@
+from __future__ import annotations
+import json
+import time
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Callable
+
+from web3._utils.encoding import Web3JsonEncoder
+from web3.types import RPCEndpoint, RPCResponse
+
+from .models import Network
+
+
+BLOCK_TAGS = {'latest', 'pending', 'earliest', 'safe', 'finalized'}
+
+# параметр блока у методов, где результат неизменен, если блок задан номером или хэшем
+BLOCK_PARAM_INDEX = {
+    'eth_call': 1,
+    'eth_getBalance': 1,
+    'eth_getCode': 1,
+    'eth_getStorageAt': 2,
+    'eth_getTransactionCount': 1,
+    'eth_getBlockByNumber': 0,
+    'eth_getBlockReceipts': 0,
+    'eth_getBlockTransactionCountByNumber': 0,
+    'eth_getTransactionByBlockNumberAndIndex': 0,
+}
+
+# методы, результат которых неизменен, как только он не null
+IMMUTABLE_METHODS = {
+    'eth_chainId',
+    'net_version',
+    'eth_getBlockByHash',
+    'eth_getBlockTransactionCountByHash',
+    'eth_getTransactionByBlockHashAndIndex',
+    'eth_getTransactionReceipt',
+}
+
+
+def is_immutable(method: str, params: list) -> bool:
+    """Whether the request can only ever return one result (if it is not null)."""
+    if method in IMMUTABLE_METHODS or method == 'eth_getTransactionByHash':
+        return True
+
+    index = BLOCK_PARAM_INDEX.get(method)
+    if index is None or len(params) <= index:
+        return False
+
+    block = params[index]
+    if isinstance(block, dict):
+        # EIP-1898: {'blockHash': ...} или {'blockNumber': ...}
+        block = block.get('blockHash') or block.get('blockNumber')
+    return isinstance(block, (str, int)) and block not in BLOCK_TAGS
+
+
+class ResponseCache:
+    """
+    Web3 middleware serving immutable JSON-RPC results from memory (and optionally from SQLite).
+
+    Results for `latest`/`pending` and other mutable requests are passed through. One cache is shared by all
+    clients of a network. Blocks and receipts requested by number or hash are assumed final: they are not
+    reorg-safe, so a result cached for a block that is later reorged out is served as is.
+
+    Disk writes are batched: new results are committed once `flush_size` of them are pending or `flush_interval`
+    seconds have passed, and on `close_all`.
+    """
+    max_size: int = 10_000
+    disk_path: str | None = None
+    flush_size: int = 100
+    flush_interval: float = 5
+
+    _caches: dict[str, ResponseCache] = {}
+
+    def __init__(self, namespace: str, max_size: int = 10_000, disk_path: str | None = None) -> None:
+        self.namespace = namespace
+        self.max_size = max_size
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.passed = 0
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._pending: dict[str, str] = {}
+        self._last_flush = time.monotonic()
+        self._db: sqlite3.Connection | None = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path)
+            self._db.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, result TEXT)')
+
+    @classmethod
+    def configure(cls, max_size: int | None = None, disk_path: str | None = None, flush_size: int | None = None,
+                  flush_interval: float | None = None) -> None:
+        """Set defaults for caches created after this call."""
+        if max_size is not None:
+            cls.max_size = max_size
+        if flush_size is not None:
+            cls.flush_size = flush_size
+        if flush_interval is not None:
+            cls.flush_interval = flush_interval
+        cls.disk_path = disk_path
+
+    @classmethod
+    def get(cls, network: Network) -> ResponseCache:
+        if network.name not in cls._caches:
+            cls._caches[network.name] = cls(namespace=network.name, max_size=cls.max_size, disk_path=cls.disk_path)
+        return cls._caches[network.name]
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Write pending results of every cache to disk. Call once on shutdown."""
+        for cache in cls._caches.values():
+            cache.flush()
+
+    def flush(self) -> None:
+        """Commit pending results in one transaction."""
+        self._last_flush = time.monotonic()
+        if not self._db or not self._pending:
+            return
+        rows, self._pending = list(self._pending.items()), {}
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO responses VALUES (?, ?)', rows)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'passed': self.passed,
+            'size': len(self._memory),
+        }
+
+    async def middleware(self, make_request: Callable, w3) -> Callable:
+        async def middleware_fn(method: RPCEndpoint, params: Any) -> RPCResponse:
+            params = params or []
+            if not is_immutable(method, params):
+                self.passed += 1
+                return await make_request(method, params)
+
+            key = f'{self.namespace}:{json.dumps([method, params], cls=Web3JsonEncoder, sort_keys=True)}'
+            found, result = self._get(key)
+            if found:
+                return {'jsonrpc': '2.0', 'id': 0, 'result': result}
+
+            self.misses += 1
+            response = await make_request(method, params)
+            result = response.get('result')
+            if 'error' not in response and result is not None and self._cacheable(method, result):
+                self._set(key, result)
+            return response
+
+        return middleware_fn
+
+    @staticmethod
+    def _cacheable(method: str, result: Any) -> bool:
+        if method == 'eth_getTransactionByHash':
+            # транзакция из мемпула еще может измениться
+            return bool(result.get('blockNumber'))
+        return True
+
+    def _get(self, key: str) -> tuple[bool, Any]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return True, self._memory[key]
+
+        if key in self._pending:
+            # уже вытеснен из памяти, но еще не записан на диск
+            self.disk_hits += 1
+            result = json.loads(self._pending[key])
+            self._remember(key, result)
+            return True, result
+
+        if self._db:
+            row = self._db.execute('SELECT result FROM responses WHERE key = ?', (key,)).fetchone()
+            if row:
+                self.disk_hits += 1
+                result = json.loads(row[0])
+                self._remember(key, result)
+                return True, result
+        return False, None
+
+    def _set(self, key: str, result: Any) -> None:
+        self._remember(key, result)
+        if self._db:
+            # commit на каждый промах блокирует event loop, поэтому пишем пачками
+            self._pending[key] = json.dumps(result)
+            if len(self._pending) >= self.flush_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def _remember(self, key: str, result: Any) -> None:
+        self._memory[key] = result
+        if len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
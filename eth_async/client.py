@@ -1,48 +1,69 @@
+import asyncio
 from random import randint
+from typing import Any, Awaitable, Callable
 
 from web3 import Web3
 from web3.eth.async_eth import AsyncEth
 from eth_account.signers.local import LocalAccount
-from fake_useragent import UserAgent
-import requests
 
-from .exceptions import InvalidProxy
 from .models import Network, Networks
 from .wallet import Wallet
 from .contracts import Contracts
 from .transactions import Transactions
+from .multicall import Multicall
+from .signing import SigningService
+from .transport import HTTPProvider, TransportRegistry
+from .sessions import LoopBoundSession
+from .routing import RoutingProvider
+from .cache import ResponseCache
+from .websocket import WebSocketConnection
+from .utils.user_agents import random_user_agent
 
 
 class Client:
+    _close_hooks: list[Callable[[], Awaitable[Any]]] = []
+
     def __init__(self,
                  private_key: str | None = None,
                  network: Network = Networks.Arbitrum,
                  proxy: str | None = None,
-                 check_proxy: bool = True) -> None:
+                 check_proxy: bool = True,
+                 hedge_after: float | None = None) -> None:
         self.network = network
         self.headers = {
             'accept': '*/*',
             'accept-language': 'en-US,en;q=0.9',
             'content-type': 'application/json',
-            'user-agent': UserAgent().chrome
+            'user-agent': random_user_agent()
         }
         self.proxy = proxy
-        if self.proxy:
-            if 'http://' not in self.proxy:
-                self.proxy = f"http://{self.proxy}"
-            if check_proxy:
-                ipaddr = requests.get('https://eth0.me/',
-                                      proxies={'http': self.proxy, 'https': self.proxy}, timeout=10).text.strip()
-                if ipaddr not in proxy:
-                    raise InvalidProxy(f"Your Proxy didn`t work! Your IP: {ipaddr}")
-        self.w3 = Web3(
-            provider=Web3.AsyncHTTPProvider(
+        if self.proxy and 'http://' not in self.proxy:
+            self.proxy = f"http://{self.proxy}"
+        # прокси проверяется один раз перед первым запросом через нее, результат кэшируется в ProxyChecker
+        if len(self.network.rpcs) > 1:
+            provider = RoutingProvider(
+                endpoints=self.network.rpcs,
+                proxy=self.proxy,
+                headers=self.headers,
+                check_proxy=check_proxy,
+                hedge_after=hedge_after,
+                network=self.network.name
+            )
+        else:
+            provider = HTTPProvider(
                 endpoint_uri=self.network.rpc,
-                request_kwargs={'proxy': self.proxy, 'headers': self.headers}
-            ),
+                proxy=self.proxy,
+                headers=self.headers,
+                check_proxy=check_proxy,
+                network=self.network.name
+            )
+        self.w3 = Web3(
+            provider=provider,
             modules={'eth': (AsyncEth,)},
-            middlewares=[]
+            middlewares=[ResponseCache.get(self.network).middleware]
         )
+        # одно WebSocket-соединение на сеть и прокси, как и HTTP-запросы, оно идет через прокси клиента
+        self.ws = WebSocketConnection.get(url=self.network.ws, proxy=self.proxy) if self.network.ws else None
         self.private_key = private_key
         if self.private_key:
             self.account: LocalAccount = self.w3.eth.account.from_key(private_key=self.private_key)
@@ -54,3 +75,20 @@ class Client:
         self.wallet = Wallet(self)
         self.contracts = Contracts(self)
         self.transactions = Transactions(self)
+        self.multicall = Multicall(self)
+
+    @classmethod
+    def on_close(cls, hook: Callable[[], Awaitable[Any]]) -> None:
+        """Register a coroutine function for close_all, ex. to close a session of a price source."""
+        if hook not in cls._close_hooks:
+            cls._close_hooks.append(hook)
+
+    @classmethod
+    async def close_all(cls) -> None:
+        """Close the connection pools shared by all clients."""
+        await asyncio.gather(*(hook() for hook in cls._close_hooks))
+        await TransportRegistry.close_all()
+        await WebSocketConnection.close_all()
+        await LoopBoundSession.close_all()
+        SigningService.close()
+        ResponseCache.close_all()
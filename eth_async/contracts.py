@@ -5,9 +5,10 @@ from web3 import Web3
 from eth_typing import ChecksumAddress
 from web3.contract.async_contract import AsyncContract
 
-from .utils.utils import async_get
-from .utils.string import text_between
 from .models import DefaultABIs, RawContract
+from .abis import ABIRegistry
+from .signatures import SignatureDatabase
+from .decoder import Decoder, parse_signature
 from .types import Contract
 
 
@@ -18,59 +19,38 @@ if TYPE_CHECKING:
 class Contracts:
     def __init__(self, client: Client) -> None:
         self.client = client
+        self._factories: dict[str, type[AsyncContract]] = {}  # abi hash -> contract factory
+        self._contracts: dict[tuple[str, str], AsyncContract] = {}  # (abi hash, address) -> contract
 
     async def default_token(self, contract_address: str | ChecksumAddress) -> AsyncContract:
-        contract_address = Web3.to_checksum_address(contract_address)
-        return self.client.w3.eth.contract(address=contract_address, abi=DefaultABIs.Token)
+        return self.contract(address=contract_address, abi=DefaultABIs.Token)
+
+    def contract(self, address: str | ChecksumAddress, abi: list | str) -> AsyncContract:
+        """Get a cached contract instance, ABIs are parsed and contract factories are built once."""
+        abi_hash, abi = ABIRegistry.load(abi)
+        key = (abi_hash, address)
+        if key not in self._contracts:
+            if abi_hash not in self._factories:
+                self._factories[abi_hash] = self.client.w3.eth.contract(abi=abi)
+                Decoder.register_abi(abi)
+            self._contracts[key] = self._factories[abi_hash](address=Web3.to_checksum_address(address))
+        return self._contracts[key]
 
     @staticmethod
     async def get_signature(hex_signature: str) -> list | None:
-        try:
-            response = await async_get(f"https://www.4byte.directory/api/v1/signatures/?hex_signature={hex_signature}")
-            results = response['results']
-            return [m['text_signature'] for m in sorted(results, key=lambda result: result['created_at'])]
-        except:
-            return
+        return await SignatureDatabase.get(hex_signature)
 
     @staticmethod
-    async def parse_function(text_signature: str):
+    async def parse_function(text_signature: str) -> dict:
         # swap(address,address,uint256,uint256,address,address)
-
-        name, sign = text_signature.split('(', 1)
-        sign = sign[:-1]
-        tuples = []
-        while '(' in sign:
-            tuple_ = text_between(text=sign[:-1], begin='(', end=')')
-            tuples.append(tuple_.split(',') or [])
-            sign = sign.replace(f'({tuple_})', 'tuple')
-
-        inputs = sign.split(',')
-        if inputs == ['']:
-            inputs = []
-
-        function = {
-            'type': 'function',
-            'name': name,
-            'inputs': [],
-            'outputs': [{'type': 'uint256'}]
-        }
-        i = 0
-        for type_ in inputs:
-            input_ = {'type': type_}
-            if type_ == 'tuple':
-                input_['components'] = [{'type': comp_type} for comp_type in tuples[i]]
-                i += 1
-
-            function['inputs'].append(input_)
-
-        return function
+        return parse_signature(text_signature)
 
     @staticmethod
     async def get_contract_attributes(contract: Contract):
         if isinstance(contract, (AsyncContract, RawContract)):
             return contract.address, contract.abi
 
-        return Web3.to_checksum_address(contract.address), None
+        return Web3.to_checksum_address(contract), None
 
     async def get(
         self, contract_address, abi: list | str | None = None
@@ -89,6 +69,4 @@ class Contracts:
         if not abi:
             abi = contract_abi
 
-        if abi:
-            return self.client.w3.eth.contract(address=contract_address, abi=abi)
-        return self.client.w3.eth.contract(address=contract_address)
+        return self.contract(address=contract_address, abi=abi)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+import asyncio
+from typing import TYPE_CHECKING, Any, Iterable
+
+from eth_abi import decode
+from hexbytes import HexBytes
+from eth_utils.abi import collapse_if_tuple, function_abi_to_4byte_selector
+
+from .abis import ABIRegistry
+from .signatures import SignatureDatabase
+
+if TYPE_CHECKING:
+    from web3 import Web3
+
+
+def split_types(sign: str) -> list[str]:
+    """Split a comma separated list of types, keeping tuples together: 'a,(b,c)[],d' -> ['a', '(b,c)[]', 'd']."""
+    types, depth, start = [], 0, 0
+    for i, char in enumerate(sign):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and not depth:
+            types.append(sign[start:i])
+            start = i + 1
+    if sign:
+        types.append(sign[start:])
+    return [type_.strip() for type_ in types]
+
+
+def parse_type(type_: str) -> dict:
+    """Build an ABI input from a type, nested tuples and arrays of tuples become 'tuple' with components."""
+    if not type_.startswith('('):
+        return {'type': type_}
+
+    depth = 0
+    for i, char in enumerate(type_):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if not depth:
+                break
+    return {
+        'type': f'tuple{type_[i + 1:]}',  # суффикс массива, ex. [] или [2]
+        'components': [parse_type(component) for component in split_types(type_[1:i])]
+    }
+
+
+def parse_signature(text_signature: str) -> dict:
+    """Build a function ABI from a text signature, ex. swap(address,(uint256,bool)[])."""
+    name, sign = text_signature.split('(', 1)
+    return {
+        'type': 'function',
+        'name': name,
+        'inputs': [parse_type(type_) for type_ in split_types(sign[:-1])],
+        'outputs': [{'type': 'uint256'}]
+    }
+
+
+class FunctionDecoder:
+    """Decoder of one function's calldata, compiled once from its ABI."""
+
+    def __init__(self, abi: dict) -> None:
+        self.abi = abi
+        self.name = abi['name']
+        self.selector = function_abi_to_4byte_selector(abi)
+        self.types = [collapse_if_tuple(input_) for input_ in abi['inputs']]
+        self.names = [input_.get('name') or f'arg{i}' for i, input_ in enumerate(abi['inputs'])]
+
+    def decode(self, data: bytes) -> dict[str, Any]:
+        return dict(zip(self.names, decode(self.types, data[4:])))
+
+
+class Decoder:
+    """
+    Calldata decoder with decoders memoized by selector.
+
+    Decoders come from registered ABIs first, unknown selectors are resolved through SignatureDatabase.
+    """
+    _decoders: dict[bytes, FunctionDecoder] = {}
+    _unknown: set[bytes] = set()
+
+    @classmethod
+    def register_abi(cls, abi: list | str) -> None:
+        _, abi = ABIRegistry.load(abi)
+        for item in abi:
+            if item.get('type') == 'function':
+                decoder = FunctionDecoder(item)
+                cls._decoders[decoder.selector] = decoder
+                cls._unknown.discard(decoder.selector)
+
+    @classmethod
+    def decode_known(cls, data: str | bytes) -> tuple[str, dict[str, Any]] | None:
+        """Decode with already compiled decoders only, without any network calls."""
+        data = HexBytes(data)
+        decoder = cls._decoders.get(bytes(data[:4]))
+        if not decoder:
+            return None
+        return decoder.name, decoder.decode(data)
+
+    @classmethod
+    async def decode(cls, data: str | bytes) -> tuple[str, dict[str, Any]] | None:
+        """
+        Decode calldata.
+
+        :return tuple[str, dict] | None: the function name and its named arguments or None if the selector is unknown.
+        """
+        data = HexBytes(data)
+        if len(data) < 4:
+            return None
+
+        await cls._resolve({bytes(data[:4])}, samples={bytes(data[:4]): data})
+        try:
+            return cls.decode_known(data)
+        except Exception:
+            return None
+
+    @classmethod
+    async def decode_many(cls, calldatas: Iterable[str | bytes]) -> list[tuple[str, dict[str, Any]] | None]:
+        """Decode a batch of calldata, every unknown selector is resolved once for the whole batch."""
+        calldatas = [HexBytes(data) for data in calldatas]
+        samples = {bytes(data[:4]): data for data in calldatas if len(data) >= 4}
+        await cls._resolve(set(samples), samples=samples)
+
+        results = []
+        for data in calldatas:
+            try:
+                results.append(cls.decode_known(data) if len(data) >= 4 else None)
+            except Exception:
+                results.append(None)
+        return results
+
+    @classmethod
+    async def decode_block(cls, w3: Web3, block_identifier: int | str = 'latest') -> list[tuple[str, Any]]:
+        """Decode input data of all transactions in a block, returns (tx hash, decoded input) pairs."""
+        block = await w3.eth.get_block(block_identifier, full_transactions=True)
+        transactions = block['transactions']
+        decoded = await cls.decode_many(tx['input'] for tx in transactions)
+        return [(tx['hash'].hex(), input_data) for tx, input_data in zip(transactions, decoded)]
+
+    @classmethod
+    async def _resolve(cls, selectors: set[bytes], samples: dict[bytes, bytes]) -> None:
+        selectors = {selector for selector in selectors if selector not in cls._decoders and selector not in cls._unknown}
+        if not selectors:
+            return
+
+        selectors = list(selectors)
+        signatures = await asyncio.gather(*(SignatureDatabase.get('0x' + selector.hex()) for selector in selectors))
+        for selector, text_signatures in zip(selectors, signatures):
+            # у одного селектора может быть несколько сигнатур, берем первую, которой получается декодировать
+            for text_signature in text_signatures or []:
+                try:
+                    decoder = FunctionDecoder(parse_signature(text_signature))
+                    decoder.decode(samples[selector])
+                except Exception:
+                    continue
+                cls._decoders[selector] = decoder
+                break
+            else:
+                if text_signatures is not None:
+                    cls._unknown.add(selector)
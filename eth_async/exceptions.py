@@ -23,3 +23,15 @@ class TransactionException(Exception):
 
 class GasTooHigh(Exception):
     pass
+
+
+class BatchRequestException(Exception):
+    pass
+
+
+class MulticallException(Exception):
+    pass
+
+
+class WebSocketException(Exception):
+    pass
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import time
+import asyncio
+
+from web3 import Web3
+
+from .models import Network
+
+
+class FeeHistory:
+    def __init__(self, block_number: int, base_fee: int, rewards: dict[int, int]) -> None:
+        self.block_number = block_number
+        self.base_fee = base_fee  # baseFeePerGas следующего блока
+        self.rewards = rewards  # percentile -> median priority fee за block_count блоков
+        self.fetched_at = time.monotonic()
+
+
+class FeeOracle:
+    """
+    Priority fee oracle built on eth_feeHistory.
+
+    One oracle is shared by all clients of a network. The history is cached until a newer block is
+    requested or `ttl` seconds pass, and concurrent callers wait for the same in-flight request.
+    A percentile that is not tracked yet is added on first use.
+    """
+    block_count: int = 5
+    percentiles: tuple[int, ...] = (10, 50, 90)
+    ttl: float = 1
+
+    _oracles: dict[str, FeeOracle] = {}
+    _settings: dict[str, dict] = {}  # network -> настройки поверх значений по умолчанию
+
+    def __init__(self,
+                 block_count: int | None = None,
+                 percentiles: tuple[int, ...] | None = None,
+                 ttl: float | None = None) -> None:
+        if block_count is not None:
+            self.block_count = block_count
+        if percentiles is not None:
+            self.percentiles = tuple(sorted(set(percentiles)))
+        if ttl is not None:
+            self.ttl = ttl
+        self._history: FeeHistory | None = None
+        self._task: asyncio.Task | None = None
+        self._task_params: tuple | None = None
+
+    @classmethod
+    def configure(cls,
+                  network: Network | None = None,
+                  block_count: int | None = None,
+                  percentiles: tuple[int, ...] | None = None,
+                  ttl: float | None = None) -> None:
+        """Set the history window, tracked percentiles and cache ttl for one network, or for all if None."""
+        if network is None:
+            if block_count is not None:
+                cls.block_count = block_count
+            if percentiles is not None:
+                cls.percentiles = tuple(sorted(set(percentiles)))
+            if ttl is not None:
+                cls.ttl = ttl
+        else:
+            settings = cls._settings.setdefault(network.name, {})
+            for key, value in (('block_count', block_count), ('percentiles', percentiles), ('ttl', ttl)):
+                if value is not None:
+                    settings[key] = value
+
+        # уже созданные оракулы пересоздаем, их история собрана со старыми настройками
+        for name in list(cls._oracles):
+            if network is None or name == network.name:
+                cls._oracles[name] = cls(**cls._settings.get(name, {}))
+
+    @classmethod
+    def get(cls, network: Network) -> FeeOracle:
+        if network.name not in cls._oracles:
+            cls._oracles[network.name] = cls(**cls._settings.get(network.name, {}))
+        return cls._oracles[network.name]
+
+    def track(self, percentile: int) -> None:
+        """Add a percentile to the tracked ones, it is fetched with the next history request."""
+        if percentile not in self.percentiles:
+            self.percentiles = tuple(sorted((*self.percentiles, percentile)))
+
+    async def priority_fee(self, w3: Web3, percentile: int = 50, block_number: int | None = None) -> int:
+        """
+        Median priority fee paid at `percentile` in the last `block_count` blocks.
+
+        :return int: the fee in wei.
+        """
+        self.track(percentile)
+        history = await self.history(w3=w3, block_number=block_number)
+        return history.rewards[percentile]
+
+    async def base_fee(self, w3: Web3, block_number: int | None = None) -> int:
+        return (await self.history(w3=w3, block_number=block_number)).base_fee
+
+    async def history(self, w3: Web3, block_number: int | None = None) -> FeeHistory:
+        history = self._history
+        if history and all(percentile in history.rewards for percentile in self.percentiles):
+            if block_number is not None and block_number <= history.block_number:
+                return history
+            if block_number is None and time.monotonic() - history.fetched_at < self.ttl:
+                return history
+
+        # запрос в полете годится, только если он был сделан с текущими настройками
+        params = (self.block_count, self.percentiles)
+        if not self._task or self._task.done() or self._task_params != params:
+            self._task = asyncio.ensure_future(self._fetch(w3=w3, block_count=self.block_count,
+                                                           percentiles=self.percentiles))
+            self._task_params = params
+        self._history = await asyncio.shield(self._task)
+        return self._history
+
+    @staticmethod
+    async def _fetch(w3: Web3, block_count: int, percentiles: tuple[int, ...]) -> FeeHistory:
+        fee_history = await w3.eth.fee_history(block_count, 'latest', list(percentiles))
+        rewards = {}
+        for i, percentile in enumerate(percentiles):
+            block_rewards = sorted(block_reward[i] for block_reward in fee_history.get('reward') or [])
+            rewards[percentile] = block_rewards[len(block_rewards) // 2] if block_rewards else 0
+
+        return FeeHistory(
+            block_number=fee_history['oldestBlock'] + len(fee_history['baseFeePerGas']) - 2,
+            base_fee=fee_history['baseFeePerGas'][-1],
+            rewards=rewards
+        )
@@ -0,0 +1,232 @@
+from __future__ import annotations
+import os
+import re
+import mmap
+import struct
+import hashlib
+import asyncio
+from typing import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import dotenv_values
+from Crypto.Cipher import AES
+from Crypto.Protocol.KDF import scrypt
+from eth_account import Account
+from eth_account.hdaccount import seed_from_mnemonic, key_from_seed
+from eth_account.signers.local import LocalAccount
+from web3 import Web3
+
+from .client import Client
+from .models import Network, Networks
+
+
+DEFAULT_PATH = "m/44'/60'/0'/0/{}"
+
+# magic, version, scrypt n, salt, CTR nonce, password check, records count
+HEADER = struct.Struct('>4sBI16s8s32sI')
+MAGIC = b'EAKS'
+VERSION = 1
+ADDRESS_SIZE = 20
+KEY_SIZE = 32
+RECORD_SIZE = ADDRESS_SIZE + KEY_SIZE
+
+PRIVATE_KEY_RE = re.compile(r'^(0x)?[0-9a-fA-F]{64}$')
+
+
+def _derive_chunk(mnemonic: str, passphrase: str, path: str, indexes: list[int]) -> list[tuple[bytes, bytes]]:
+    # выполняется в дочернем процессе, seed считается один раз на чанк, а не на каждый аккаунт
+    seed = seed_from_mnemonic(mnemonic, passphrase)
+    accounts = []
+    for index in indexes:
+        key = key_from_seed(seed, path.format(index))
+        accounts.append((bytes.fromhex(Account.from_key(key).address[2:]), key))
+    return accounts
+
+
+async def derive_accounts(mnemonic: str,
+                          count: int,
+                          start: int = 0,
+                          passphrase: str = '',
+                          path: str = DEFAULT_PATH,
+                          chunk_size: int = 100,
+                          max_workers: int | None = None) -> list[tuple[bytes, bytes]]:
+    """
+    Derive HD accounts of a mnemonic in a process pool.
+
+    :param path: the derivation path with `{}` in place of the account index.
+    :return list[tuple[bytes, bytes]]: (address, private key) pairs in index order.
+    """
+    Account.enable_unaudited_hdwallet_features()
+    loop = asyncio.get_running_loop()
+    indexes = list(range(start, start + count))
+    chunks = [indexes[i:i + chunk_size] for i in range(0, len(indexes), chunk_size)]
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, _derive_chunk, mnemonic, passphrase, path, chunk) for chunk in chunks))
+    return [account for chunk in results for account in chunk]
+
+
+def read_env_secrets(path: str) -> tuple[list[str], list[str]]:
+    """
+    Read private keys and mnemonics from a .env-style file.
+
+    Values may hold several private keys separated by commas or whitespace, a value of 12+ words is a mnemonic.
+
+    :return tuple[list[str], list[str]]: (private keys, mnemonics).
+    """
+    private_keys = []
+    mnemonics = []
+    for value in dotenv_values(path).values():
+        if not value:
+            continue
+        words = value.split()
+        if len(words) >= 12 and all(word.isalpha() for word in words):
+            mnemonics.append(' '.join(words))
+            continue
+        private_keys += [token for token in re.split(r'[\s,]+', value) if PRIVATE_KEY_RE.match(token)]
+    return private_keys, mnemonics
+
+
+class KeyStore:
+    """
+    Compact encrypted file of private keys, memory-mapped and decrypted one record at a time.
+
+    Each record is a 20-byte address in the clear followed by a 32-byte key encrypted with AES-CTR under a
+    scrypt-derived key, so addresses can be listed and searched without the password or any decryption.
+    """
+
+    def __init__(self, path: str, password: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, salt, self._nonce, check, self._count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a key store file')
+
+        self._key, expected_check = self._derive_key(password=password, salt=salt, n=n)
+        if check != expected_check:
+            self.close()
+            raise ValueError('Wrong key store password')
+        self._index: dict[bytes, int] | None = None
+
+    @classmethod
+    def create(cls, path: str, private_keys: Iterable[str | bytes], password: str, n: int = 2 ** 15) -> int:
+        """
+        Write a key store file, duplicate keys are skipped.
+
+        :return int: the number of stored keys.
+        """
+        salt = os.urandom(16)
+        nonce = os.urandom(8)
+        key, check = cls._derive_key(password=password, salt=salt, n=n)
+
+        seen = set()
+        count = 0
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b'\0' * HEADER.size)
+            for private_key in private_keys:
+                private_key = bytes(Web3.to_bytes(hexstr=private_key) if isinstance(private_key, str) else private_key)
+                if private_key in seen:
+                    continue
+                seen.add(private_key)
+                address = bytes.fromhex(Account.from_key(private_key).address[2:])
+                f.write(address + cls._cipher(key=key, nonce=nonce, index=count).encrypt(private_key))
+                count += 1
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, n, salt, nonce, check, count))
+        os.replace(tmp_path, path)
+        return count
+
+    @classmethod
+    async def build(cls,
+                    path: str,
+                    password: str,
+                    env_files: Iterable[str] = (),
+                    private_keys: Iterable[str] = (),
+                    mnemonics: Iterable[str] = (),
+                    accounts_per_mnemonic: int = 1,
+                    n: int = 2 ** 15) -> KeyStore:
+        """Collect keys from .env files, explicit keys and mnemonics (derived in bulk) into a new key store."""
+        private_keys = list(private_keys)
+        mnemonics = list(mnemonics)
+        for env_file in env_files:
+            file_keys, file_mnemonics = read_env_secrets(env_file)
+            private_keys += file_keys
+            mnemonics += file_mnemonics
+
+        for mnemonic in mnemonics:
+            private_keys += [key for _, key in await derive_accounts(mnemonic=mnemonic, count=accounts_per_mnemonic)]
+
+        cls.create(path=path, private_keys=private_keys, password=password, n=n)
+        return cls(path=path, password=password)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        """Private keys one by one, only the current one is held in memory."""
+        for index in range(self._count):
+            yield self.private_key(index)
+
+    def address(self, index: int) -> str:
+        offset = self._offset(index)
+        return Web3.to_checksum_address(self._mmap[offset:offset + ADDRESS_SIZE])
+
+    def addresses(self) -> list[str]:
+        return [self.address(index) for index in range(self._count)]
+
+    def index(self, address: str) -> int:
+        """The record number of an address, raises KeyError if it is not stored."""
+        if self._index is None:
+            self._index = {}
+            for index in range(self._count):
+                offset = self._offset(index)
+                self._index[self._mmap[offset:offset + ADDRESS_SIZE]] = index
+        return self._index[bytes.fromhex(Web3.to_checksum_address(address)[2:])]
+
+    def private_key(self, index: int) -> str:
+        offset = self._offset(index) + ADDRESS_SIZE
+        encrypted = self._mmap[offset:offset + KEY_SIZE]
+        return '0x' + self._cipher(key=self._key, nonce=self._nonce, index=index).decrypt(encrypted).hex()
+
+    def account(self, index: int) -> LocalAccount:
+        account = Account.from_key(self.private_key(index))
+        if account.address != self.address(index):
+            raise ValueError(f'Key store record {index} is corrupted')
+        return account
+
+    def client(self, index: int, network: Network = Networks.Arbitrum, **kwargs) -> Client:
+        return Client(private_key=self.private_key(index), network=network, **kwargs)
+
+    def clients(self, network: Network = Networks.Arbitrum, **kwargs) -> Iterator[Client]:
+        """Clients of all stored keys, created on demand."""
+        for index in range(self._count):
+            yield self.client(index, network=network, **kwargs)
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> KeyStore:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _offset(self, index: int) -> int:
+        if not 0 <= index < self._count:
+            raise IndexError(f'Key store has no record {index}')
+        return HEADER.size + index * RECORD_SIZE
+
+    @staticmethod
+    def _derive_key(password: str, salt: bytes, n: int) -> tuple[bytes, bytes]:
+        derived = scrypt(password, salt, key_len=64, N=n, r=8, p=1)
+        return derived[:32], hashlib.sha256(derived[32:]).digest()
+
+    @staticmethod
+    def _cipher(key: bytes, nonce: bytes, index: int):
+        # ключ записи занимает два блока AES, поэтому у каждой записи свой диапазон счетчика
+        return AES.new(key, AES.MODE_CTR, nonce=nonce, initial_value=index * KEY_SIZE // AES.block_size)
@@ -0,0 +1,213 @@
+from __future__ import annotations
+import os
+import json
+import asyncio
+import hashlib
+from collections import deque
+from typing import TYPE_CHECKING, AsyncIterator
+
+from web3 import Web3
+from web3.types import EventData, LogReceipt
+from web3._utils.events import get_event_data
+from eth_utils import event_abi_to_log_topic
+
+from .abis import ABIRegistry
+from .models import DefaultABIs
+from .types import Contract
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+# так разные ноды отвечают, когда диапазон блоков или число логов слишком велики
+RANGE_ERRORS = (
+    'query returned more than',  # Infura, geth
+    'response size exceeded', 'response size is larger',  # Alchemy, Cloudflare
+    'block range', 'blocks range', 'range is too large', 'range too large', 'range is too wide',
+    'exceed maximum block range', 'is limited to a',  # geth, BSC, QuickNode
+    'too many results', 'too many logs', 'max results', 'query timeout exceeded',
+)
+# rate limit приходит с тем же -32005 и похожими словами, его не дробим, а ждем
+RATE_LIMIT_CODES = (429,)
+RATE_LIMIT_ERRORS = (
+    'rate limit', 'rate exceeded', 'request rate', 'too many requests', 'request count', 'requests per',
+    'capacity', 'credits', 'throttl',
+)
+
+
+def address_topic(address: str) -> str:
+    """An address padded to 32 bytes, as it appears in indexed event arguments."""
+    return '0x' + '00' * 12 + Web3.to_checksum_address(address)[2:].lower()
+
+
+class LogScanner:
+    """
+    Streams decoded events of a block range with eth_getLogs.
+
+    The range is split into chunks of `chunk_size` blocks fetched `concurrency` at a time and yielded in block
+    order. A chunk the node refuses as too large is split in half and the chunk size for the rest of the scan is
+    reduced, a chunk with few logs doubles it. With `checkpoint_path`, the last fully yielded block is saved
+    there, and a new scan with the same filter resumes after it.
+    """
+
+    def __init__(self,
+                 client: Client,
+                 contract: Contract | list[Contract] | None = None,
+                 abi: list | str = DefaultABIs.Token,
+                 events: list[str] | None = None,
+                 topics: list | None = None,
+                 chunk_size: int = 2_000,
+                 min_chunk_size: int = 1,
+                 max_chunk_size: int = 100_000,
+                 target_logs: int = 2_000,
+                 concurrency: int = 4,
+                 retries: int = 3,
+                 retry_delay: float = 1,
+                 checkpoint_path: str | None = None) -> None:
+        """
+        :param contract: emitting contract(s), any contract if None.
+        :param abi: the ABI with event definitions.
+        :param events: names of events to scan, all events of the ABI if None.
+        :param topics: filters for indexed arguments (topics 1-3), ex. `[None, [address_topic(wallet)]]`
+            for Transfers to a wallet.
+        :param target_logs: the chunk size grows while chunks return fewer than half of this many logs.
+        """
+        self.client = client
+        contracts = contract if isinstance(contract, list) else [contract] if contract else []
+        self.addresses = [Web3.to_checksum_address(self._address(item)) for item in contracts]
+        _, abi = ABIRegistry.load(abi)
+        self.events = {
+            Web3.to_hex(event_abi_to_log_topic(item)): item
+            for item in abi
+            if item.get('type') == 'event' and (events is None or item['name'] in events)
+        }
+        if not self.events:
+            raise ValueError('No events to scan in the ABI')
+        self.topics = [list(self.events), *(topics or [])]
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.target_logs = target_logs
+        self.concurrency = concurrency
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.checkpoint_path = checkpoint_path
+
+    @property
+    def checkpoint_key(self) -> str:
+        """Identifies the filter, so checkpoints of different scans don't mix."""
+        key = json.dumps([self.client.network.name, self.addresses, self.topics], sort_keys=True)
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    def checkpoint(self) -> int | None:
+        """The last block this filter was fully scanned to."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as file:
+            return json.load(file).get(self.checkpoint_key)
+
+    async def scan(self, from_block: int, to_block: int | None = None) -> AsyncIterator[EventData]:
+        """
+        Yield decoded events from `from_block` to `to_block` (the current block if None) in chain order.
+
+        Resumes after the saved checkpoint if there is one.
+        """
+        if to_block is None:
+            to_block = await self.client.w3.eth.block_number
+        checkpoint = self.checkpoint()
+        if checkpoint is not None:
+            from_block = max(from_block, checkpoint + 1)
+
+        chunks: deque[tuple[int, asyncio.Task]] = deque()
+        next_block = from_block
+        try:
+            while chunks or next_block <= to_block:
+                # держим `concurrency` чанков в работе, а отдаем их строго по порядку
+                while next_block <= to_block and len(chunks) < self.concurrency:
+                    last_block = min(next_block + self.chunk_size - 1, to_block)
+                    chunks.append((last_block, asyncio.create_task(self._fetch(next_block, last_block))))
+                    next_block = last_block + 1
+
+                last_block, task = chunks.popleft()
+                for log in await task:
+                    event = self.decode(log)
+                    if event:
+                        yield event
+                self._save_checkpoint(last_block)
+        finally:
+            for _, task in chunks:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in chunks), return_exceptions=True)
+
+    def decode(self, log: LogReceipt) -> EventData | None:
+        """Decode a log with the scanner's ABI, None for logs of unknown or differently indexed events."""
+        if not log['topics']:
+            return None
+        event_abi = self.events.get(Web3.to_hex(log['topics'][0]))
+        if not event_abi:
+            return None
+        try:
+            return get_event_data(self.client.w3.codec, event_abi, log)
+        except Exception:
+            # например, ERC-721 Transfer с тем же topic0, но другим числом indexed аргументов
+            return None
+
+    async def _fetch(self, first_block: int, last_block: int) -> list[LogReceipt]:
+        params = {'fromBlock': first_block, 'toBlock': last_block, 'topics': self.topics}
+        if self.addresses:
+            params['address'] = self.addresses if len(self.addresses) > 1 else self.addresses[0]
+
+        for attempt in range(self.retries + 1):
+            try:
+                logs = await self.client.w3.eth.get_logs(params)
+            except Exception as err:
+                if self.is_range_error(err) and last_block > first_block:
+                    size = last_block - first_block + 1
+                    # больше не растем до размера, который нода уже отвергла
+                    self.max_chunk_size = max(self.min_chunk_size, min(self.max_chunk_size, size - 1))
+                    self.chunk_size = max(self.min_chunk_size, min(self.chunk_size, size // 2))
+                    middle = (first_block + last_block) // 2
+                    return await self._fetch(first_block, middle) + await self._fetch(middle + 1, last_block)
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+                continue
+
+            if len(logs) < self.target_logs // 2 and last_block - first_block + 1 >= self.chunk_size:
+                self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+            return logs
+
+    @staticmethod
+    def is_rate_limit_error(err: Exception) -> bool:
+        status = getattr(err, 'status', None) or getattr(err, 'status_code', None)
+        if status in RATE_LIMIT_CODES:
+            return True
+        error = err.args[0] if err.args else None
+        if isinstance(error, dict) and error.get('code') in RATE_LIMIT_CODES:
+            return True
+        message = str(err).lower()
+        return any(text in message for text in RATE_LIMIT_ERRORS)
+
+    @classmethod
+    def is_range_error(cls, err: Exception) -> bool:
+        if cls.is_rate_limit_error(err):
+            return False
+        message = str(err).lower()
+        return any(text in message for text in RANGE_ERRORS)
+
+    def _save_checkpoint(self, block: int) -> None:
+        if not self.checkpoint_path:
+            return
+        stored = {}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as file:
+                stored = json.load(file)
+        stored[self.checkpoint_key] = block
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(stored, file, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    @staticmethod
+    def _address(contract: Contract) -> str:
+        return contract if isinstance(contract, str) else contract.address
@@ -0,0 +1,143 @@
+from __future__ import annotations
+import bisect
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def endpoint_label(url: str) -> str:
+    # только хост и порт: в пути и query у RPC часто лежит API-ключ
+    parts = urlsplit(url)
+    return f'{parts.hostname}:{parts.port}' if parts.port else str(parts.hostname)
+
+
+class MethodStats:
+    """Counters and a latency histogram of one (network, endpoint, method) series."""
+    __slots__ = ('calls', 'errors', 'bytes_sent', 'bytes_received', 'latency_sum', 'buckets')
+
+    def __init__(self, buckets_count: int) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (buckets_count + 1)  # последний - +Inf
+
+
+class RPCMetrics:
+    """
+    Per-method JSON-RPC instrumentation shared by all clients.
+
+    Providers report every request with `record`. With `enabled = False` the providers skip timing and
+    recording altogether. Read the numbers with `snapshot()` or expose them to Prometheus with `prometheus()`
+    or `start_server()`.
+    """
+    enabled: bool = True
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+
+    _series: dict[tuple[str, str, str], MethodStats] = {}
+    _server: web.AppRunner | None = None
+
+    @classmethod
+    def configure(cls, enabled: bool | None = None, buckets: tuple[float, ...] | None = None) -> None:
+        if enabled is not None:
+            cls.enabled = enabled
+        if buckets is not None:
+            cls.buckets = tuple(sorted(buckets))
+            cls._series.clear()
+
+    @classmethod
+    def record(cls, network: str, endpoint: str, method: str, latency: float, error: bool = False,
+               bytes_sent: int = 0, bytes_received: int = 0) -> None:
+        key = (network, endpoint, method)
+        stats = cls._series.get(key)
+        if stats is None:
+            stats = cls._series[key] = MethodStats(len(cls.buckets))
+        stats.calls += 1
+        stats.errors += error
+        stats.bytes_sent += bytes_sent
+        stats.bytes_received += bytes_received
+        stats.latency_sum += latency
+        stats.buckets[bisect.bisect_left(cls.buckets, latency)] += 1
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._series.clear()
+
+    @classmethod
+    def snapshot(cls) -> list[dict]:
+        """Current values of every series, histogram buckets are cumulative like in Prometheus."""
+        result = []
+        for (network, endpoint, method), stats in cls._series.items():
+            cumulative = []
+            total = 0
+            for count in stats.buckets:
+                total += count
+                cumulative.append(total)
+            result.append({
+                'network': network,
+                'endpoint': endpoint,
+                'method': method,
+                'calls': stats.calls,
+                'errors': stats.errors,
+                'bytes_sent': stats.bytes_sent,
+                'bytes_received': stats.bytes_received,
+                'latency_sum': stats.latency_sum,
+                'latency_avg': stats.latency_sum / stats.calls if stats.calls else 0,
+                'buckets': dict(zip([*cls.buckets, float('inf')], cumulative)),
+            })
+        return result
+
+    @classmethod
+    def prometheus(cls) -> str:
+        """All series in the Prometheus text exposition format."""
+        snapshot = cls.snapshot()
+        lines = []
+        counters = (
+            ('eth_async_rpc_requests_total', 'JSON-RPC requests.', 'calls'),
+            ('eth_async_rpc_errors_total', 'JSON-RPC requests that failed or returned an error.', 'errors'),
+            ('eth_async_rpc_sent_bytes_total', 'Bytes of request bodies.', 'bytes_sent'),
+            ('eth_async_rpc_received_bytes_total', 'Bytes of response bodies.', 'bytes_received'),
+        )
+        for name, help_text, field in counters:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            lines += [f'{name}{{{cls._labels(item)}}} {item[field]}' for item in snapshot]
+
+        name = 'eth_async_rpc_latency_seconds'
+        lines += [f'# HELP {name} JSON-RPC request latency.', f'# TYPE {name} histogram']
+        for item in snapshot:
+            labels = cls._labels(item)
+            for bound, count in item['buckets'].items():
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {item["latency_sum"]}')
+            lines.append(f'{name}_count{{{labels}}} {item["calls"]}')
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    async def start_server(cls, host: str = '0.0.0.0', port: int = 9100) -> None:
+        """Serve `prometheus()` at /metrics until stop_server is called."""
+        async def handle(request: web.Request) -> web.Response:
+            return web.Response(text=cls.prometheus(), content_type='text/plain', charset='utf-8')
+
+        await cls.stop_server()
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        cls._server = web.AppRunner(app)
+        await cls._server.setup()
+        await web.TCPSite(cls._server, host, port).start()
+
+    @classmethod
+    async def stop_server(cls) -> None:
+        if cls._server:
+            await cls._server.cleanup()
+            cls._server = None
+
+    @staticmethod
+    def _labels(item: dict) -> str:
+        values = (item['network'], item['endpoint'], item['method'])
+        escaped = [str(value).replace('\\', '\\\\').replace('"', '\\"') for value in values]
+        return 'network="{}",endpoint="{}",method="{}"'.format(*escaped)
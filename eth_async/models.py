@@ -1,32 +1,180 @@
+from __future__ import annotations
+import asyncio
 from decimal import Decimal
+from typing import Iterable, Iterator
 from dataclasses import dataclass
 
-from web3 import Web3
 from eth_typing import ChecksumAddress
-import requests
+from web3.types import RPCEndpoint
 
 from . import exceptions
+from .transport import HTTPProvider
+from .utils.chains import ChainList
 
 
 class TokenAmount:
+    """An amount of a token stored as an int of wei, Ether is computed only when it is read."""
+    __slots__ = ('Wei', 'decimals', '_ether')
+
     Wei: int
-    Ether: Decimal
     decimals: int
 
     def __init__(self, amount: str | int | float | Decimal, decimals: int = 18, wei: bool = False) -> None:
         match wei:
             case True:
                 self.Wei: int = int(amount)
-                self.Ether: Decimal = Decimal(str(amount)) / 10 ** decimals
+            case False if isinstance(amount, int):
+                self.Wei: int = amount * 10 ** decimals
             case False:
                 self.Wei: int = int(Decimal(str(amount)) * 10 ** decimals)
-                self.Ether: Decimal = Decimal(str(amount))
 
         self.decimals = decimals
+        self._ether: Decimal | None = None
+
+    @property
+    def Ether(self) -> Decimal:
+        if self._ether is None:
+            self._ether = Decimal(self.Wei) / 10 ** self.decimals
+        return self._ether
+
+    def _other_wei(self, other: TokenAmount | int) -> int:
+        """Wei of the other operand, ints are treated as wei."""
+        if isinstance(other, TokenAmount):
+            if other.decimals != self.decimals:
+                raise ValueError(f"Can`t combine amounts with {self.decimals} and {other.decimals} decimals")
+            return other.Wei
+        if isinstance(other, int):
+            return other
+        return NotImplemented
+
+    def __add__(self, other: TokenAmount | int) -> TokenAmount:
+        other_wei = self._other_wei(other)
+        if other_wei is NotImplemented:
+            return NotImplemented
+        return TokenAmount(amount=self.Wei + other_wei, decimals=self.decimals, wei=True)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: TokenAmount | int) -> TokenAmount:
+        other_wei = self._other_wei(other)
+        if other_wei is NotImplemented:
+            return NotImplemented
+        return TokenAmount(amount=self.Wei - other_wei, decimals=self.decimals, wei=True)
+
+    def __mul__(self, other: int | float | Decimal) -> TokenAmount:
+        if isinstance(other, int):
+            return TokenAmount(amount=self.Wei * other, decimals=self.decimals, wei=True)
+        if isinstance(other, (float, Decimal)):
+            return TokenAmount(amount=int(self.Wei * Decimal(str(other))), decimals=self.decimals, wei=True)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: int | float | Decimal) -> TokenAmount:
+        if isinstance(other, int):
+            return TokenAmount(amount=self.Wei // other, decimals=self.decimals, wei=True)
+        if isinstance(other, (float, Decimal)):
+            return TokenAmount(amount=int(self.Wei / Decimal(str(other))), decimals=self.decimals, wei=True)
+        return NotImplemented
+
+    def __eq__(self, other: object) -> bool:
+        # равенство, как и арифметика, в wei: иначе hash не согласовать с int, которые тоже считаются wei
+        if isinstance(other, TokenAmount):
+            return self.Wei == other.Wei and self.decimals == other.decimals
+        if isinstance(other, int):
+            return self.Wei == other
+        return NotImplemented
+
+    # сравнение, как и арифметика, только при одинаковых decimals: иначе порядок расходился бы с __eq__ и hash
+    def __lt__(self, other: TokenAmount | int) -> bool:
+        other_wei = self._other_wei(other)
+        return other_wei if other_wei is NotImplemented else self.Wei < other_wei
+
+    def __le__(self, other: TokenAmount | int) -> bool:
+        other_wei = self._other_wei(other)
+        return other_wei if other_wei is NotImplemented else self.Wei <= other_wei
+
+    def __gt__(self, other: TokenAmount | int) -> bool:
+        other_wei = self._other_wei(other)
+        return other_wei if other_wei is NotImplemented else self.Wei > other_wei
+
+    def __ge__(self, other: TokenAmount | int) -> bool:
+        other_wei = self._other_wei(other)
+        return other_wei if other_wei is NotImplemented else self.Wei >= other_wei
+
+    def __hash__(self) -> int:
+        return hash(self.Wei)
 
     def __str__(self) -> str:
         return f"{self.Ether}"
 
+    def __repr__(self) -> str:
+        return f"TokenAmount(Wei={self.Wei}, decimals={self.decimals})"
+
+
+class TokenAmountArray:
+    """
+    Column of token amounts with the same decimals, stored as plain ints of wei.
+
+    Used for bulk balances instead of a list of TokenAmount, so no per-item objects are allocated.
+    """
+    __slots__ = ('wei', 'decimals')
+
+    def __init__(self, wei: Iterable[int] = (), decimals: int = 18) -> None:
+        self.wei: list[int] = list(wei)
+        self.decimals = decimals
+
+    @classmethod
+    def from_amounts(cls, amounts: Iterable[TokenAmount], decimals: int = 18) -> TokenAmountArray:
+        amounts = list(amounts)
+        if amounts:
+            decimals = amounts[0].decimals
+        return cls((amount.Wei for amount in amounts), decimals=decimals)
+
+    def __len__(self) -> int:
+        return len(self.wei)
+
+    def __iter__(self) -> Iterator[TokenAmount]:
+        return (TokenAmount(amount=wei, decimals=self.decimals, wei=True) for wei in self.wei)
+
+    def __getitem__(self, item: int | slice) -> TokenAmount | TokenAmountArray:
+        if isinstance(item, slice):
+            return TokenAmountArray(self.wei[item], decimals=self.decimals)
+        return TokenAmount(amount=self.wei[item], decimals=self.decimals, wei=True)
+
+    def sum(self) -> TokenAmount:
+        return TokenAmount(amount=sum(self.wei), decimals=self.decimals, wei=True)
+
+    def mask(self, min_wei: int = 1, max_wei: int | None = None) -> list[bool]:
+        """Mask of amounts within [min_wei, max_wei], ex. to pick the same addresses from a parallel list."""
+        if max_wei is None:
+            return [wei >= min_wei for wei in self.wei]
+        return [min_wei <= wei <= max_wei for wei in self.wei]
+
+    def filter(self, mask: Iterable[bool]) -> TokenAmountArray:
+        return TokenAmountArray((wei for wei, keep in zip(self.wei, mask) if keep), decimals=self.decimals)
+
+    def format(self, precision: int = 6) -> list[str]:
+        """Format all amounts with `precision` fractional digits using int arithmetic only."""
+        precision = min(precision, self.decimals)
+        scale = 10 ** (self.decimals - precision)
+        unit = 10 ** precision
+        formatted = []
+        for wei in self.wei:
+            sign = '-' if wei < 0 else ''
+            integer, fraction = divmod(abs(wei) // scale, unit)
+            formatted.append(f'{sign}{integer}.{fraction:0{precision}d}' if precision else f'{sign}{integer}')
+        return formatted
+
+    def to_numpy(self):
+        """NumPy object array of wei ints (wei may not fit into int64). Requires numpy."""
+        import numpy as np
+
+        return np.array(self.wei, dtype=object)
+
+    def __repr__(self) -> str:
+        return f"TokenAmountArray(len={len(self.wei)}, decimals={self.decimals})"
+
 
 @dataclass
 class DefaultABIs:
@@ -101,42 +249,131 @@ class DefaultABIs:
             'outputs': [], 'payable': False,
             'stateMutability': 'nonpayable',
             'type': 'function'
+        },
+        {
+            'anonymous': False,
+            'inputs': [
+                {'indexed': True, 'name': 'from', 'type': 'address'},
+                {'indexed': True, 'name': 'to', 'type': 'address'},
+                {'indexed': False, 'name': 'value', 'type': 'uint256'}
+            ],
+            'name': 'Transfer',
+            'type': 'event'
+        },
+        {
+            'anonymous': False,
+            'inputs': [
+                {'indexed': True, 'name': 'owner', 'type': 'address'},
+                {'indexed': True, 'name': 'spender', 'type': 'address'},
+                {'indexed': False, 'name': 'value', 'type': 'uint256'}
+            ],
+            'name': 'Approval',
+            'type': 'event'
         }]
 
+    UniswapV2Pair = [
+        {
+            'anonymous': False,
+            'inputs': [
+                {'indexed': True, 'name': 'sender', 'type': 'address'},
+                {'indexed': False, 'name': 'amount0In', 'type': 'uint256'},
+                {'indexed': False, 'name': 'amount1In', 'type': 'uint256'},
+                {'indexed': False, 'name': 'amount0Out', 'type': 'uint256'},
+                {'indexed': False, 'name': 'amount1Out', 'type': 'uint256'},
+                {'indexed': True, 'name': 'to', 'type': 'address'}
+            ],
+            'name': 'Swap',
+            'type': 'event'
+        }]
+
+    Multicall3 = [
+        {
+            'inputs': [
+                {
+                    'components': [
+                        {'name': 'target', 'type': 'address'},
+                        {'name': 'allowFailure', 'type': 'bool'},
+                        {'name': 'callData', 'type': 'bytes'}
+                    ],
+                    'name': 'calls',
+                    'type': 'tuple[]'
+                }
+            ],
+            'name': 'aggregate3',
+            'outputs': [
+                {
+                    'components': [
+                        {'name': 'success', 'type': 'bool'},
+                        {'name': 'returnData', 'type': 'bytes'}
+                    ],
+                    'name': 'returnData',
+                    'type': 'tuple[]'
+                }
+            ],
+            'stateMutability': 'payable',
+            'type': 'function'
+        }]
+
+
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
 
 class Network:
     def __init__(self,
                  name: str,
-                 rpc: str,
+                 rpc: str | list[str],
                  chain_id: int | None = None,
                  tx_type: int = 0,
                  coin_symbol: str | None = None,
-                 explorer: str | None = None
+                 explorer: str | None = None,
+                 multicall: str | None = MULTICALL3_ADDRESS,
+                 ws: str | None = None
                  ) -> None:
         self.name = name.lower()
-        self.rpc = rpc
+        self.rpcs = [rpc] if isinstance(rpc, str) else list(rpc)
+        self.rpc = self.rpcs[0]
         self.chain_id = chain_id
         self.tx_type = tx_type
-        self.coin_symbol = coin_symbol  # ex. ETH
+        self.coin_symbol = coin_symbol.upper() if coin_symbol else None  # ex. ETH
         self.explorer = explorer
-
+        self.multicall = multicall
+        self.ws = ws  # необязательный WebSocket RPC для подписок вместо опроса
+        self._resolve_lock: asyncio.Lock | None = None
+
+    @property
+    def resolved(self) -> bool:
+        return bool(self.chain_id and self.coin_symbol)
+
+    async def resolve(self) -> Network:
+        """Fill in chain_id and coin_symbol if they were not passed. Network calls are made only once."""
+        if self.resolved:
+            return self
+
+        if self._resolve_lock is None:
+            self._resolve_lock = asyncio.Lock()
+        async with self._resolve_lock:
+            if not self.chain_id:
+                try:
+                    response = await HTTPProvider(endpoint_uri=self.rpc, network=self.name).make_request(
+                        RPCEndpoint('eth_chainId'), [])
+                    self.chain_id = int(response['result'], 16)
+                except Exception as err:
+                    raise exceptions.WrongChainID(f"ERROR when getting chain id: {err}")
+
+            if not self.coin_symbol:
+                try:
+                    chain = await ChainList.get(self.chain_id)
+                    if chain:
+                        self.coin_symbol = chain['nativeCurrency']['symbol'].upper()
+                except Exception as err:
+                    raise exceptions.WrongCoinSymbol(f"ERROR when getting coin symbol: {err}")
+
+        return self
+
+    async def get_chain_id(self) -> int:
         if not self.chain_id:
-            try:
-                self.chain_id = Web3(Web3.HTTPProvider(endpoint_uri=self.rpc)).eth.chain_id
-            except Exception as err:
-                raise exceptions.WrongChainID(f"ERROR when getting chain id: {err}")
-
-        if not self.coin_symbol:
-            try:
-                resp = requests.get("https://chainid.network/chains.json").json()
-                for network in resp:
-                    if network["chainId"] == self.chain_id:
-                        self.coin_symbol = network["nativeCurrency"]["symbol"]
-                        break
-            except Exception as err:
-                raise exceptions.WrongCoinSymbol(f"ERROR when getting coin symbol: {err}")
-        if self.coin_symbol:
-            self.coin_symbol = self.coin_symbol.upper()
+            await self.resolve()
+        return self.chain_id
 
 
 class Networks:
@@ -202,6 +439,7 @@ class Networks:
         tx_type=2,
         coin_symbol='ETH',
         explorer="https://explorer.zksync.io",
+        multicall='0xF9cda624FBC7e059355ce98a31693d299FACd963',
     )
 
     Avalanche = Network(
@@ -277,11 +515,20 @@ class RawContract:
     title: str
     address: ChecksumAddress
     abi: list[dict[str]]
+    chain_id: int | None
+    decimals: int | None
 
-    def __init__(self, title: str, address: ChecksumAddress, abi: list[dict[str]] | str) -> None:
+    def __init__(self,
+                 title: str,
+                 address: ChecksumAddress,
+                 abi: list[dict[str]] | str,
+                 chain_id: int | None = None,
+                 decimals: int | None = None) -> None:
         self.title = title
         self.address = address
         self.abi = abi
+        self.chain_id = chain_id
+        self.decimals = decimals  # для токенов, используется для пресида TokenCache
 
 
 @dataclass
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types
+from web3._utils.contracts import encode_abi
+from web3.contract.async_contract import AsyncContractFunction
+
+from .models import DefaultABIs
+from .exceptions import MulticallException
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+class Multicall:
+    """
+    Coalesces read calls made within a short window into one Multicall3 `aggregate3` call.
+
+    Every call is sent with allowFailure, so a reverted call fails only its own awaiter.
+    """
+
+    def __init__(self, client: Client, window: float = 0.01, max_calls: int = 500) -> None:
+        self.client = client
+        self.window = window
+        self.max_calls = max_calls
+        self._pending: list[tuple[AsyncContractFunction, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    @property
+    def address(self) -> str | None:
+        return self.client.network.multicall
+
+    async def call(self, function: AsyncContractFunction) -> Any:
+        """
+        Call a contract read function through the aggregator.
+
+        :return Any: the decoded result, the same as `function.call()` would return.
+        """
+        if not self.address:
+            return await function.call()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((function, future))
+        if len(self._pending) >= self.max_calls:
+            self._schedule_flush(loop, delay=0)
+        elif not self._flush_handle:
+            self._schedule_flush(loop, delay=self.window)
+        return await future
+
+    async def call_many(self, functions: list[AsyncContractFunction]) -> list[Any]:
+        """Call several functions in one aggregate3, exceptions are returned in place of failed results."""
+        return await asyncio.gather(*(self.call(function) for function in functions), return_exceptions=True)
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        if self._flush_handle:
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(delay, self._start_flush, loop)
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        # держим ссылку на задачу, иначе GC может собрать ее посреди запроса
+        task = loop.create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        self._flush_tasks.discard(task)
+        if not task.cancelled():
+            # ошибки запроса _flush уже отдал ожидающим, здесь только помечаем исключение полученным
+            task.exception()
+
+    async def _flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending[:self.max_calls], self._pending[self.max_calls:]
+        if self._pending:
+            self._schedule_flush(asyncio.get_running_loop(), delay=0)
+        if not pending:
+            return
+
+        w3 = self.client.w3
+        try:
+            calls = [
+                (function.address, True, encode_abi(w3, function.abi, function.arguments, function.selector))
+                for function, _ in pending
+            ]
+            multicall = w3.eth.contract(address=Web3.to_checksum_address(self.address), abi=DefaultABIs.Multicall3)
+            results = await multicall.functions.aggregate3(calls).call()
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        except Exception as err:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for (function, future), (success, return_data) in zip(pending, results):
+            if future.done():
+                continue
+            if not success or (not return_data and function.abi['outputs']):
+                future.set_exception(MulticallException(f"{function.fn_name} call to {function.address} failed"))
+                continue
+            try:
+                output_types = get_abi_output_types(function.abi)
+                result = w3.codec.decode(output_types, return_data)
+                future.set_result(result[0] if len(result) == 1 else result)
+            except Exception as err:
+                future.set_exception(err)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import heapq
+import asyncio
+
+from web3 import Web3
+
+
+# нода отвергла транзакцию, но транзакция с этим nonce уже в пуле или в блоке
+ALREADY_SENT_ERRORS = (
+    'already known', 'known transaction', 'already imported', 'already exists', 'replacement transaction underpriced',
+    'nonce too low',
+)
+
+
+class NonceManager:
+    """
+    In-process nonce allocator for one (chain_id, address).
+
+    Syncs the pending nonce from chain once and then hands out nonces locally, so several transactions
+    from one wallet can be submitted without waiting for each other.
+    """
+    _managers: dict[tuple[int, str], NonceManager] = {}
+
+    def __init__(self, chain_id: int, address: str) -> None:
+        self.chain_id = chain_id
+        self.address = address
+        self._nonce: int | None = None
+        self._released: list[int] = []
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def get(cls, chain_id: int, address: str) -> NonceManager:
+        key = (chain_id, Web3.to_checksum_address(address))
+        if key not in cls._managers:
+            cls._managers[key] = cls(chain_id=chain_id, address=key[1])
+        return cls._managers[key]
+
+    async def next(self, w3: Web3) -> int:
+        """Allocate the next nonce, syncing it from chain on first use or after a reset."""
+        async with self._lock:
+            if self._nonce is None:
+                self._nonce = await w3.eth.get_transaction_count(self.address, 'pending')
+                self._released.clear()
+
+            if self._released:
+                return heapq.heappop(self._released)
+
+            nonce = self._nonce
+            self._nonce += 1
+            return nonce
+
+    async def peek(self, w3: Web3) -> int:
+        """The nonce the next allocation would return, without allocating it."""
+        async with self._lock:
+            if self._nonce is None:
+                self._nonce = await w3.eth.get_transaction_count(self.address, 'pending')
+                self._released.clear()
+            return self._released[0] if self._released else self._nonce
+
+    def release(self, nonce: int) -> None:
+        """Return a nonce whose transaction was never broadcast, it will be handed out again first."""
+        if self._nonce is None or nonce >= self._nonce or nonce in self._released:
+            return
+        heapq.heappush(self._released, nonce)
+
+    def reset(self) -> None:
+        """Forget the local state, the next allocation resyncs from chain."""
+        self._nonce = None
+        self._released.clear()
+
+    @staticmethod
+    def is_nonce_error(err: Exception) -> bool:
+        message = str(err).lower()
+        return 'nonce too low' in message or 'nonce too high' in message or 'invalid nonce' in message
+
+    @staticmethod
+    def is_rejected(err: Exception) -> bool:
+        """
+        Whether the node definitely refused to accept the transaction, so its nonce is still free.
+
+        Only JSON-RPC error responses count, timeouts and lost responses are ambiguous: the node may have
+        accepted the transaction.
+        """
+        error = err.args[0] if isinstance(err, ValueError) and err.args else None
+        if not isinstance(error, dict) or 'message' not in error:
+            return False
+        message = str(error['message']).lower()
+        return not any(text in message for text in ALREADY_SENT_ERRORS)
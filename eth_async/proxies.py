@@ -0,0 +1,76 @@
+from __future__ import annotations
+import time
+import asyncio
+
+import aiohttp
+
+from .exceptions import InvalidProxy
+
+
+class ProxyChecker:
+    """
+    Checks proxies concurrently with aiohttp and caches the results for `ttl` seconds.
+
+    A proxy is valid if the IP seen by `url` is part of the proxy string. Concurrent checks of the same proxy
+    share one request.
+    """
+    url: str = 'https://eth0.me/'
+    ttl: float = 10 * 60
+    timeout: float = 10
+
+    _results: dict[str, tuple[bool, str | None, float]] = {}
+    _checks: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def cached(cls, proxy: str) -> tuple[bool, str | None] | None:
+        """Get a cached (is valid, seen ip) result or None if the proxy wasn't checked recently."""
+        result = cls._results.get(proxy)
+        if result and time.monotonic() - result[2] < cls.ttl:
+            return result[0], result[1]
+        return None
+
+    @classmethod
+    async def check(cls, proxy: str) -> bool:
+        cached = cls.cached(proxy)
+        if cached:
+            return cached[0]
+
+        task = cls._checks.get(proxy)
+        if not task or task.done():
+            task = cls._checks[proxy] = asyncio.ensure_future(cls._check(proxy))
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def check_many(cls, proxies: list[str], concurrency: int = 100) -> dict[str, bool]:
+        """Check many proxies at once, at most `concurrency` in flight."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def check(proxy: str) -> bool:
+            async with semaphore:
+                return await cls.check(proxy)
+
+        results = await asyncio.gather(*(check(proxy) for proxy in proxies))
+        return dict(zip(proxies, results))
+
+    @classmethod
+    async def ensure(cls, proxy: str) -> None:
+        """Raise InvalidProxy if the proxy doesn't work."""
+        if not await cls.check(proxy):
+            ipaddr = cls._results[proxy][1]
+            raise InvalidProxy(f"Your Proxy didn`t work! Your IP: {ipaddr}")
+
+    @classmethod
+    async def _check(cls, proxy: str) -> bool:
+        ipaddr = None
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(cls.url, proxy=proxy,
+                                       timeout=aiohttp.ClientTimeout(total=cls.timeout)) as resp:
+                    ipaddr = (await resp.text()).strip()
+            valid = bool(ipaddr) and ipaddr in proxy
+        except Exception:
+            valid = False
+
+        cls._results[proxy] = (valid, ipaddr, time.monotonic())
+        cls._checks.pop(proxy, None)
+        return valid
@@ -0,0 +1,114 @@
+from __future__ import annotations
+import time
+import asyncio
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from web3 import Web3
+from web3.contract.async_contract import AsyncContract
+
+from .abis import ABIRegistry
+from .models import TokenAmount
+from .types import Contract
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+class Quoter:
+    """
+    Swap quotes from a router's `getAmountsOut`.
+
+    Quotes requested at the same time go out in one Multicall3 `aggregate3` call, and every quote is cached for
+    the block it was read at, so repeated quotes within a block cost nothing. The current block number is
+    itself cached for `block_ttl` seconds per network.
+    """
+    block_ttl: float = 1
+    max_size: int = 10_000
+
+    _quotes: OrderedDict[tuple, tuple[int, list[int]]] = OrderedDict()  # key -> (block, amounts)
+    _inflight: dict[tuple, asyncio.Future] = {}
+    _blocks: dict[str, tuple[int, float]] = {}  # network -> (block, monotonic time)
+    _block_requests: dict[str, asyncio.Task] = {}
+
+    def __init__(self, client: Client, router: Contract, abi: list | str | None = None) -> None:
+        self.client = client
+        self.router = router
+        self.abi = abi
+
+    @staticmethod
+    def supports(router: Contract, abi: list | str | None = None) -> bool:
+        """Whether the router ABI has `getAmountsOut`."""
+        abi = abi or getattr(router, 'abi', None)
+        if not abi:
+            return False
+        _, abi = ABIRegistry.load(abi)
+        return any(item.get('type') == 'function' and item.get('name') == 'getAmountsOut' for item in abi)
+
+    async def quote(self, amount_in: int | TokenAmount, path: list[Contract]) -> list[int]:
+        """
+        Amounts along `path` for `amount_in` of the first token, the same as router.getAmountsOut returns.
+
+        :return list[int]: amounts in wei, the last one is the output amount.
+        """
+        contract = await self._contract()
+        amount_in = amount_in.Wei if isinstance(amount_in, TokenAmount) else int(amount_in)
+        path = [Web3.to_checksum_address(token if isinstance(token, str) else token.address) for token in path]
+        block = await self.block_number()
+        key = (self.client.network.name, contract.address, amount_in, tuple(path))
+
+        cached = self._quotes.get(key)
+        if cached and cached[0] == block:
+            self._quotes.move_to_end(key)
+            return cached[1]
+
+        # одинаковые котировки в одном блоке запрашиваем один раз
+        future = self._inflight.get((key, block))
+        if not future:
+            future = self._inflight[(key, block)] = asyncio.ensure_future(
+                self.client.multicall.call(contract.functions.getAmountsOut(amount_in, path)))
+            future.add_done_callback(lambda _: self._inflight.pop((key, block), None))
+        amounts = list(await asyncio.shield(future))
+
+        self._quotes[key] = (block, amounts)
+        self._quotes.move_to_end(key)
+        if len(self._quotes) > self.max_size:
+            self._quotes.popitem(last=False)
+        return amounts
+
+    async def amount_out(self, amount_in: int | TokenAmount, path: list[Contract]) -> int:
+        return (await self.quote(amount_in=amount_in, path=path))[-1]
+
+    async def quote_many(self, requests: list[tuple[int | TokenAmount, list[Contract]]]) -> list[list[int] | Exception]:
+        """Quote many (amount in, path) pairs in one multicall, exceptions are returned in place of failed quotes."""
+        return await asyncio.gather(
+            *(self.quote(amount_in=amount_in, path=path) for amount_in, path in requests), return_exceptions=True)
+
+    async def amount_out_min(self, amount_in: int | TokenAmount, path: list[Contract], slippage: float,
+                             decimals: int = 18) -> TokenAmount:
+        """The quoted output reduced by `slippage` percent, ex. for a swap amountOutMin."""
+        amount_out = await self.amount_out(amount_in=amount_in, path=path)
+        return TokenAmount(amount=amount_out * (10_000 - round(slippage * 100)) // 10_000, decimals=decimals, wei=True)
+
+    async def block_number(self) -> int:
+        network = self.client.network.name
+        cached = self._blocks.get(network)
+        if cached and time.monotonic() - cached[1] < self.block_ttl:
+            return cached[0]
+
+        task = self._block_requests.get(network)
+        if not task or task.done():
+            task = self._block_requests[network] = asyncio.ensure_future(self._fetch_block_number())
+        return await asyncio.shield(task)
+
+    async def _fetch_block_number(self) -> int:
+        network = self.client.network.name
+        try:
+            block = await self.client.w3.eth.block_number
+            self._blocks[network] = (block, time.monotonic())
+            return block
+        finally:
+            self._block_requests.pop(network, None)
+
+    async def _contract(self) -> AsyncContract:
+        return await self.client.contracts.get(contract_address=self.router, abi=self.abi)
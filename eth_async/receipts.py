@@ -0,0 +1,186 @@
+from __future__ import annotations
+import asyncio
+from typing import Any
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.types import RPCEndpoint, TxReceipt
+from web3.exceptions import TimeExhausted
+from web3._utils.method_formatters import receipt_formatter
+
+from .models import Network
+from .websocket import Subscription, WebSocketConnection
+
+
+# так ноды отвечают на eth_getBlockReceipts, которого у них нет
+METHOD_NOT_FOUND_CODES = (-32601,)
+METHOD_NOT_FOUND_ERRORS = ('method not found', 'does not exist', 'not supported', 'unsupported method')
+
+
+class ReceiptWatcher:
+    """
+    Waits for receipts of many transactions of one network with a single polling loop.
+
+    The loop checks the chain once per new block: it fetches the whole block with eth_getBlockReceipts
+    where the node supports it, otherwise it looks up all pending hashes in one JSON-RPC batch. With a WebSocket
+    URL the loop wakes up on newHeads notifications instead of sleeping `poll_interval`.
+    """
+    _watchers: dict[str, ReceiptWatcher] = {}
+
+    def __init__(self, poll_interval: float = 1, max_block_lag: int = 10, ws_url: str | None = None) -> None:
+        self.poll_interval = poll_interval
+        self.ws_url = ws_url
+        self.max_block_lag = max_block_lag
+        self.block_receipts: bool | None = None  # None - еще не знаем, поддерживает ли нода eth_getBlockReceipts
+        self._w3: Web3 | None = None
+        self._pending: dict[str, asyncio.Future] = {}
+        self._waiters: dict[str, int] = {}
+        self._unchecked: set[str] = set()
+        self._last_block: int | None = None
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def get(cls, network: Network) -> ReceiptWatcher:
+        if network.name not in cls._watchers:
+            cls._watchers[network.name] = cls(ws_url=network.ws)
+        return cls._watchers[network.name]
+
+    async def wait(self, w3: Web3, tx_hash: str | bytes, timeout: float = 120) -> TxReceipt:
+        """Wait for a receipt, raises web3 TimeExhausted after `timeout` seconds."""
+        tx_hash = HexBytes(tx_hash).hex()
+        if not tx_hash.startswith('0x'):
+            tx_hash = f'0x{tx_hash}'
+        tx_hash = tx_hash.lower()
+        self._w3 = w3
+
+        future = self._pending.get(tx_hash)
+        if not future:
+            future = self._pending[tx_hash] = asyncio.get_running_loop().create_future()
+            self._unchecked.add(tx_hash)
+        self._waiters[tx_hash] = self._waiters.get(tx_hash, 0) + 1
+
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeExhausted(f"Transaction {tx_hash} is not in the chain after {timeout} seconds")
+        finally:
+            self._waiters[tx_hash] -= 1
+            if not self._waiters[tx_hash]:
+                # больше никто не ждет этот хэш, перестаем его отслеживать
+                del self._waiters[tx_hash]
+                self._pending.pop(tx_hash, None)
+                self._unchecked.discard(tx_hash)
+
+    async def _run(self) -> None:
+        heads = await self._subscribe_heads()
+        try:
+            while self._pending:
+                try:
+                    await self._poll()
+                except Exception:
+                    # временная ошибка RPC, повторим на следующем круге, ожидающие упадут по своему таймауту
+                    pass
+                await self._wait_block(heads)
+        finally:
+            if heads:
+                await heads.unsubscribe()
+            self._last_block = None
+
+    async def _subscribe_heads(self) -> Subscription | None:
+        if not self.ws_url:
+            return None
+        try:
+            # общая на сеть подписка на заголовки блоков без прокси: в ней нет ничего о кошельках
+            return await WebSocketConnection.get(url=self.ws_url).subscribe_new_heads(max_queue=1)
+        except Exception:
+            return None
+
+    async def _wait_block(self, heads: Subscription | None) -> None:
+        if not heads:
+            await asyncio.sleep(self.poll_interval)
+            return
+        try:
+            # новый блок или, если уведомления не идут, контрольный опрос
+            await asyncio.wait_for(heads.__anext__(), timeout=self.poll_interval * 10)
+        except asyncio.TimeoutError:
+            pass
+        except StopAsyncIteration:
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll(self) -> None:
+        w3 = self._w3
+        block_number = await w3.eth.block_number
+        unchecked = set(self._unchecked)
+        if self._last_block is not None and block_number <= self._last_block and not unchecked:
+            return
+
+        first_block = block_number if self._last_block is None else self._last_block + 1
+        if block_number - first_block + 1 > self.max_block_lag:
+            # пропущенные блоки не смотрим, поэтому все ожидающие хэши проверяем по одному
+            first_block = block_number - self.max_block_lag + 1
+            unchecked |= set(self._pending)
+
+        if self.block_receipts is not False:
+            for number in range(first_block, block_number + 1):
+                if not await self._check_block(w3, number):
+                    break
+                # при ошибке следующий опрос продолжит с первого необработанного блока
+                self._last_block = number
+            if self.block_receipts:
+                # хэши, отправленные до начала отслеживания, могли попасть в более старые блоки
+                await self._check_hashes(w3, [tx_hash for tx_hash in unchecked if tx_hash in self._pending])
+                self._unchecked -= unchecked
+                return
+
+        await self._check_hashes(w3, [tx_hash for tx_hash, future in self._pending.items() if not future.done()])
+        self._last_block = block_number
+        self._unchecked -= unchecked
+
+    async def _check_block(self, w3: Web3, block_number: int) -> bool:
+        response = await w3.provider.make_request(RPCEndpoint('eth_getBlockReceipts'), [hex(block_number)])
+        if 'error' in response:
+            if self.is_method_not_found(response['error']):
+                self.block_receipts = False
+                return False
+            # rate limit и прочие временные ошибки: блок проверим на следующем опросе
+            raise ValueError(f"eth_getBlockReceipts failed: {response['error']}")
+        if not isinstance(response.get('result'), list):
+            # нода еще не знает этот блок
+            raise ValueError(f'eth_getBlockReceipts returned no receipts for block {block_number}')
+
+        self.block_receipts = True
+        for receipt in response['result']:
+            self._resolve(receipt)
+        return True
+
+    @staticmethod
+    def is_method_not_found(error: dict | str) -> bool:
+        if isinstance(error, dict):
+            if error.get('code') in METHOD_NOT_FOUND_CODES:
+                return True
+            error = error.get('message', '')
+        message = str(error).lower()
+        return any(text in message for text in METHOD_NOT_FOUND_ERRORS)
+
+    async def _check_hashes(self, w3: Web3, tx_hashes: list[str]) -> None:
+        if not tx_hashes:
+            return
+
+        requests = [('eth_getTransactionReceipt', [tx_hash]) for tx_hash in tx_hashes]
+        if hasattr(w3.provider, 'make_batch_request'):
+            responses = await w3.provider.make_batch_request(requests)
+        else:
+            responses = await asyncio.gather(
+                *(w3.provider.make_request(RPCEndpoint(method), params) for method, params in requests))
+
+        for response in responses:
+            if response.get('result'):
+                self._resolve(response['result'])
+
+    def _resolve(self, receipt: dict[str, Any]) -> None:
+        future = self._pending.get(receipt['transactionHash'].lower())
+        if future and not future.done():
+            future.set_result(receipt_formatter(receipt))
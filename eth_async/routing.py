@@ -0,0 +1,163 @@
+from __future__ import annotations
+import json
+import time
+import asyncio
+
+from .transport import HTTPProvider, Transport, TransportRegistry
+
+
+# методы только на чтение, их можно безопасно продублировать во второй endpoint
+HEDGE_METHODS = {
+    'eth_call', 'eth_getBalance', 'eth_getTransactionCount', 'eth_blockNumber', 'eth_chainId', 'eth_gasPrice',
+    'eth_maxPriorityFeePerGas', 'eth_feeHistory', 'eth_estimateGas', 'eth_getCode', 'eth_getLogs',
+    'eth_getBlockByNumber', 'eth_getBlockByHash', 'eth_getBlockReceipts', 'eth_getTransactionByHash',
+    'eth_getTransactionReceipt',
+}
+
+# ошибки, которые вызвал сам запрос (revert, неверные параметры, отвергнутая транзакция), а не нода
+REQUEST_ERROR_CODES = {3, -32602}
+REQUEST_ERRORS = (
+    'revert', 'nonce too', 'insufficient funds', 'already known', 'underpriced', 'gas required exceeds',
+)
+
+
+def is_node_error(response: bytes) -> bool:
+    """Whether a JSON-RPC response (or any response of a batch) carries an error of the node itself."""
+    if b'"error"' not in response:
+        return False
+    try:
+        decoded = json.loads(response)
+    except ValueError:
+        return True
+
+    for item in decoded if isinstance(decoded, list) else [decoded]:
+        error = item.get('error') if isinstance(item, dict) else None
+        if not isinstance(error, dict):
+            continue
+        message = str(error.get('message', '')).lower()
+        if error.get('code') in REQUEST_ERROR_CODES or any(text in message for text in REQUEST_ERRORS):
+            continue
+        return True
+    return False
+
+
+class EndpointStats:
+    """Moving averages of latency and error rate of one endpoint, shared by all clients."""
+    alpha: float = 0.2
+    cooldown: float = 30
+
+    _stats: dict[str, EndpointStats] = {}
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.latency: float = 0
+        self.error_rate: float = 0
+        self.last_error: float = 0
+        self.requests: int = 0
+
+    @classmethod
+    def get(cls, url: str) -> EndpointStats:
+        if url not in cls._stats:
+            cls._stats[url] = cls(url)
+        return cls._stats[url]
+
+    @property
+    def healthy(self) -> bool:
+        return self.error_rate < 0.5 or time.monotonic() - self.last_error > self.cooldown
+
+    @property
+    def score(self) -> float:
+        # новые endpoint'ы пробуем первыми, чтобы набрать статистику
+        if not self.requests:
+            return 0
+        return self.latency * (1 + 10 * self.error_rate)
+
+    def record(self, latency: float | None) -> None:
+        """Record a request, latency is None for a failed one."""
+        self.requests += 1
+        if latency is None:
+            self.error_rate += self.alpha * (1 - self.error_rate)
+            self.last_error = time.monotonic()
+            return
+
+        self.error_rate -= self.alpha * self.error_rate
+        self.latency = latency if self.requests == 1 else self.latency + self.alpha * (latency - self.latency)
+
+
+class RoutingProvider(HTTPProvider):
+    """
+    HTTPProvider over several endpoints of one network.
+
+    Each request goes to the fastest healthy endpoint and fails over to the next one on a transport error.
+    With `hedge_after`, a read request still pending after that many seconds is also sent to the second best
+    endpoint and the first response wins.
+    """
+
+    def __init__(self,
+                 endpoints: list[str],
+                 proxy: str | None = None,
+                 headers: dict | None = None,
+                 check_proxy: bool = False,
+                 hedge_after: float | None = None,
+                 network: str | None = None) -> None:
+        super().__init__(endpoint_uri=endpoints[0], proxy=proxy, headers=headers, check_proxy=check_proxy,
+                         network=network)
+        self.endpoints = endpoints
+        self.hedge_after = hedge_after
+        self.transports = {url: TransportRegistry.get(rpc=url, proxy=proxy) for url in endpoints}
+
+    def ranked(self) -> list[str]:
+        """Endpoints from best to worst, unhealthy ones go last."""
+        stats = [EndpointStats.get(url) for url in self.endpoints]
+        return [item.url for item in sorted(stats, key=lambda item: (not item.healthy, item.score))]
+
+    async def _post(self, data: bytes, method: str | None = None) -> bytes:
+        await self._ensure_proxy()
+        ranked = self.ranked()
+        if self.hedge_after is not None and method in HEDGE_METHODS and len(ranked) > 1:
+            return await self._hedged_post(data=data, ranked=ranked, method=method)
+
+        error = None
+        for url in ranked:
+            try:
+                return await self._timed_post(self.transports[url], data=data, method=method)
+            except Exception as err:
+                error = err
+        raise error
+
+    async def _timed_post(self, transport: Transport, data: bytes, method: str | None = None) -> bytes:
+        stats = EndpointStats.get(transport.rpc)
+        started = time.monotonic()
+        try:
+            response = await self._send(transport, data=data, method=method)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats.record(latency=None)
+            raise
+        # ответ 200 с JSON-RPC ошибкой (rate limit, внутренняя ошибка) - такой же сбой endpoint'а
+        stats.record(latency=None if is_node_error(response) else time.monotonic() - started)
+        return response
+
+    async def _hedged_post(self, data: bytes, ranked: list[str], method: str | None = None) -> bytes:
+        primary = asyncio.create_task(self._timed_post(self.transports[ranked[0]], data=data, method=method))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if done and not primary.exception():
+                return primary.result()
+
+            error = primary.exception() if done else None
+            tasks = tasks - done
+            tasks.add(asyncio.create_task(self._timed_post(self.transports[ranked[1]], data=data, method=method)))
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.exception():
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # в том числе при отмене внешнего вызова: запросы не должны остаться висеть
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+import weakref
+import asyncio
+from typing import Callable
+
+import aiohttp
+
+
+class LoopBoundSession:
+    """
+    A lazily created aiohttp.ClientSession that follows the running event loop.
+
+    A session is bound to the loop it was created in. It is closed when asyncio.run shuts that loop down (the
+    remaining tasks are cancelled then), or in its own loop if the loop still runs in another thread when a
+    different loop asks for a session. All instances are closed by `close_all`.
+    """
+    _instances: weakref.WeakSet[LoopBoundSession] = weakref.WeakSet()
+
+    def __init__(self, factory: Callable[[], aiohttp.ClientSession]) -> None:
+        self.factory = factory
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closer: asyncio.Task | None = None
+        self._instances.add(self)
+
+    @classmethod
+    async def close_all(cls) -> None:
+        await asyncio.gather(*(session.close() for session in list(cls._instances)))
+
+    def get(self) -> aiohttp.ClientSession:
+        """The session of the running loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._loop is not loop:
+            self._release()
+        if self._session is None or self._session.closed:
+            self._session = self.factory()
+            self._loop = loop
+            self._closer = loop.create_task(self._close_with_loop(self._session))
+        return self._session
+
+    async def close(self) -> None:
+        if self._session and self._loop is not asyncio.get_running_loop():
+            self._release()
+        if self._closer:
+            self._closer.cancel()
+            self._closer = None
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    @staticmethod
+    async def _close_with_loop(session: aiohttp.ClientSession) -> None:
+        # asyncio.run отменяет оставшиеся задачи перед закрытием loop, тогда и закрываем соединения
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            if not session.closed:
+                await session.close()
+
+    def _release(self) -> None:
+        # сессию другого loop нельзя закрыть через await из текущего
+        session, loop = self._session, self._loop
+        self._session = self._loop = self._closer = None
+        if session is None or session.closed:
+            return
+        if loop.is_running():
+            # loop работает в другом потоке, закрываем сессию в нем
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        # иначе loop остановлен: сессию закроет _close_with_loop, когда этот loop будут завершать
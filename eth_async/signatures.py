@@ -0,0 +1,203 @@
+from __future__ import annotations
+import os
+import csv
+import json
+import mmap
+import time
+import struct
+import asyncio
+from collections import OrderedDict
+from typing import Iterable
+
+import aiohttp
+from eth_utils import function_signature_to_4byte_selector
+
+from .exceptions import HTTPException
+from .sessions import LoopBoundSession
+
+
+class SelectorIndex:
+    """
+    Memory-mapped index of 4-byte selector -> text signatures.
+
+    File layout: header (magic, count), `count` sorted records (selector, offset, length), then the
+    utf-8 signatures blob. Lookups are a binary search over the mapped records, nothing is loaded in memory.
+    """
+    MAGIC = b'4BYT'
+    HEADER = struct.Struct('>4sI')
+    RECORD = struct.Struct('>4sIH')
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = self.HEADER.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"{path} is not a selector index")
+        self._blob_start = self.HEADER.size + self.count * self.RECORD.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def get(self, hex_signature: str) -> list[str]:
+        selector = bytes.fromhex(hex_signature.removeprefix('0x')[:8])
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] < selector:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        signatures = []
+        while lo < self.count:
+            record_selector, offset, length = self._record(lo)
+            if record_selector != selector:
+                break
+            start = self._blob_start + offset
+            signatures.append(self._mmap[start:start + length].decode())
+            lo += 1
+        return signatures
+
+    def _record(self, i: int) -> tuple[bytes, int, int]:
+        return self.RECORD.unpack_from(self._mmap, self.HEADER.size + i * self.RECORD.size)
+
+    @classmethod
+    def build(cls, path: str, signatures: Iterable[tuple[str | None, str]]) -> int:
+        """
+        Write an index from (hex selector, text signature) pairs, the selector may be None to compute it.
+
+        :return int: the number of indexed signatures.
+        """
+        records = set()
+        for hex_signature, text_signature in signatures:
+            text_signature = text_signature.strip()
+            if not text_signature:
+                continue
+            if hex_signature:
+                selector = bytes.fromhex(hex_signature.removeprefix('0x')[:8])
+            else:
+                selector = function_signature_to_4byte_selector(text_signature)
+            records.add((selector, text_signature))
+
+        records = sorted(records)
+        blob = bytearray()
+        header = [cls.HEADER.pack(cls.MAGIC, len(records))]
+        for selector, text_signature in records:
+            encoded = text_signature.encode()
+            header.append(cls.RECORD.pack(selector, len(blob), len(encoded)))
+            blob += encoded
+
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(b''.join(header))
+            file.write(blob)
+        os.replace(tmp_path, path)
+        return len(records)
+
+    @classmethod
+    def import_dump(cls, dump_path: str, path: str) -> int:
+        """
+        Build an index from a signatures dump.
+
+        Supported dumps: a JSON list of 4byte.directory results, JSON lines of them, CSV with
+        hex_signature/text_signature columns, or plain text with one `selector signature` or `signature` per line.
+        """
+        with open(dump_path, encoding='utf-8') as file:
+            head = file.read(1)
+            file.seek(0)
+            if head == '[':
+                items = json.load(file)
+                return cls.build(path, ((item.get('hex_signature'), item['text_signature']) for item in items))
+            if head == '{':
+                items = (json.loads(line) for line in file if line.strip())
+                return cls.build(path, ((item.get('hex_signature'), item['text_signature']) for item in items))
+            if dump_path.endswith('.csv'):
+                rows = csv.DictReader(file)
+                return cls.build(path, ((row.get('hex_signature'), row['text_signature']) for row in rows))
+            return cls.build(path, (cls._parse_text_line(line) for line in file))
+
+    @staticmethod
+    def _parse_text_line(line: str) -> tuple[str | None, str]:
+        line = line.strip()
+        if line.startswith('0x') and len(line) > 10 and line[10] in ' ,\t':
+            return line[:10], line[11:]
+        return None, line
+
+
+class SignatureDatabase:
+    """
+    Resolves selectors from a local SelectorIndex first and from 4byte.directory otherwise.
+
+    Remote lookups are single-flight, rate limited to one per `min_interval` seconds and cached in an LRU.
+    """
+    url: str = 'https://www.4byte.directory/api/v1/signatures/'
+    min_interval: float = 0.2
+    cache_size: int = 10_000
+
+    _index: SelectorIndex | None = None
+    _cache: OrderedDict[str, list[str] | None] = OrderedDict()
+    _lookups: dict[str, asyncio.Task] = {}
+    _rate_lock: asyncio.Lock | None = None
+    _session = LoopBoundSession(lambda: aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)))
+    _last_request: float = 0
+
+    @classmethod
+    def configure(cls, index_path: str | None = None, min_interval: float | None = None,
+                  cache_size: int | None = None) -> None:
+        if cls._index:
+            cls._index.close()
+        cls._index = SelectorIndex(index_path) if index_path and os.path.exists(index_path) else None
+        if min_interval is not None:
+            cls.min_interval = min_interval
+        if cache_size is not None:
+            cls.cache_size = cache_size
+
+    @classmethod
+    async def get(cls, hex_signature: str) -> list[str] | None:
+        hex_signature = hex_signature[:10].lower()
+        if cls._index:
+            signatures = cls._index.get(hex_signature)
+            if signatures:
+                return signatures
+
+        if hex_signature in cls._cache:
+            cls._cache.move_to_end(hex_signature)
+            return cls._cache[hex_signature]
+
+        task = cls._lookups.get(hex_signature)
+        if not task:
+            task = cls._lookups[hex_signature] = asyncio.ensure_future(cls._remote_get(hex_signature))
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _remote_get(cls, hex_signature: str) -> list[str] | None:
+        try:
+            if cls._rate_lock is None:
+                cls._rate_lock = asyncio.Lock()
+            async with cls._rate_lock:
+                delay = cls._last_request + cls.min_interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                cls._last_request = time.monotonic()
+
+            async with cls._session.get().get(cls.url, params={'hex_signature': hex_signature}) as resp:
+                if resp.status > 201:
+                    raise HTTPException(response=resp, status_code=resp.status)
+                response = await resp.json()
+            results = response['results']
+            signatures = [m['text_signature'] for m in sorted(results, key=lambda result: result['created_at'])]
+        except Exception:
+            # ошибку сети не кэшируем, попробуем еще раз при следующем запросе
+            return None
+        finally:
+            cls._lookups.pop(hex_signature, None)
+
+        cls._cache[hex_signature] = signatures or None
+        if len(cls._cache) > cls.cache_size:
+            cls._cache.popitem(last=False)
+        return signatures or None
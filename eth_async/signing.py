@@ -0,0 +1,75 @@
+from __future__ import annotations
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from eth_account import Account
+from eth_account.datastructures import SignedTransaction
+from web3.types import TxParams
+
+
+def _sign_chunk(chunk: list[tuple[str | bytes, TxParams]]) -> list[SignedTransaction]:
+    # выполняется в дочернем процессе, ключи приходят только через pipe пула
+    return [Account.sign_transaction(transaction_dict=tx, private_key=key) for key, tx in chunk]
+
+
+class SigningService:
+    """
+    Signs transactions in a local process pool, so a burst of signatures doesn't block the event loop.
+
+    Jobs are split into chunks of `chunk_size` to amortize the IPC overhead. Bursts smaller than
+    `min_pool_size` are signed in-process, where starting the pool would cost more than it saves.
+    """
+    max_workers: int | None = None
+    chunk_size: int = 64
+    min_pool_size: int = 32
+
+    _executor: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def configure(cls,
+                  max_workers: int | None = None,
+                  chunk_size: int | None = None,
+                  min_pool_size: int | None = None) -> None:
+        """Set the pool parameters, a running pool is shut down and recreated on the next call."""
+        cls.close()
+        cls.max_workers = max_workers
+        if chunk_size is not None:
+            cls.chunk_size = chunk_size
+        if min_pool_size is not None:
+            cls.min_pool_size = min_pool_size
+
+    @classmethod
+    async def sign(cls, private_key: str | bytes, tx_params: TxParams) -> SignedTransaction:
+        return (await cls.sign_many([(private_key, tx_params)]))[0]
+
+    @classmethod
+    async def sign_many(cls, jobs: list[tuple[str | bytes, TxParams]]) -> list[SignedTransaction]:
+        """
+        Sign many transactions.
+
+        :param jobs: (private key, transaction dict) pairs.
+        :return list[SignedTransaction]: signed transactions in the order of `jobs`.
+        """
+        jobs = [(key, dict(tx)) for key, tx in jobs]
+        if len(jobs) < cls.min_pool_size:
+            return _sign_chunk(jobs)
+
+        loop = asyncio.get_running_loop()
+        executor = cls._get_executor()
+        chunks = [jobs[i:i + cls.chunk_size] for i in range(0, len(jobs), cls.chunk_size)]
+        results = await asyncio.gather(*(loop.run_in_executor(executor, _sign_chunk, chunk) for chunk in chunks))
+        return [signed for chunk in results for signed in chunk]
+
+    @classmethod
+    def close(cls) -> None:
+        if cls._executor:
+            # вызывается из async close_all: не ждем процессы, чтобы не блокировать event loop
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ProcessPoolExecutor(max_workers=cls.max_workers or os.cpu_count())
+        return cls._executor
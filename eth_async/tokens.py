@@ -0,0 +1,89 @@
+import os
+import json
+
+from web3 import Web3
+
+from .models import RawContract
+
+
+class TokenCache:
+    """
+    Token metadata (decimals, symbol, name) keyed by (chain_id, address).
+
+    Kept in memory and mirrored to a JSON file, so metadata is fetched from chain only once per token.
+    """
+    path: str | None = None
+
+    _tokens: dict[tuple[int, str], dict] = {}
+    _loaded: bool = False
+
+    @classmethod
+    def configure(cls, path: str | None) -> None:
+        """Set the backing JSON file and load the tokens already stored in it."""
+        cls.path = path
+        cls._loaded = False
+        cls._load()
+
+    @classmethod
+    def get(cls, chain_id: int, address: str) -> dict | None:
+        cls._load()
+        return cls._tokens.get((chain_id, Web3.to_checksum_address(address)))
+
+    @classmethod
+    def set(cls, chain_id: int, address: str, **metadata) -> dict:
+        cls._load()
+        key = (chain_id, Web3.to_checksum_address(address))
+        token = cls._tokens.setdefault(key, {})
+        new = {field: value for field, value in metadata.items() if value is not None and token.get(field) != value}
+        if new:
+            token.update(new)
+            cls._dump()
+        return token
+
+    @classmethod
+    def seed(cls, contracts) -> None:
+        """Pre-seed the cache from RawContract attributes of a class (ex. data.models.Contracts)."""
+        cls._load()
+        changed = False
+        for contract in vars(contracts).values():
+            if not isinstance(contract, RawContract) or not contract.chain_id or contract.decimals is None:
+                continue
+
+            key = (contract.chain_id, Web3.to_checksum_address(contract.address))
+            token = cls._tokens.setdefault(key, {})
+            if token.get('decimals') != contract.decimals:
+                token['decimals'] = contract.decimals
+                changed = True
+
+        if changed:
+            cls._dump()
+
+    @classmethod
+    def _load(cls) -> None:
+        if cls._loaded:
+            return
+
+        cls._loaded = True
+        if not cls.path or not os.path.exists(cls.path):
+            return
+
+        try:
+            with open(cls.path) as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        for key, token in stored.items():
+            chain_id, address = key.split(':', 1)
+            cls._tokens.setdefault((int(chain_id), address), {}).update(token)
+
+    @classmethod
+    def _dump(cls) -> None:
+        if not cls.path:
+            return
+
+        stored = {f'{chain_id}:{address}': token for (chain_id, address), token in cls._tokens.items()}
+        tmp_path = f'{cls.path}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(stored, file, indent=2)
+        os.replace(tmp_path, cls.path)
@@ -1,15 +1,22 @@
 from __future__ import annotations
+import time
+import asyncio
 from typing import TYPE_CHECKING, Any
 from hexbytes import HexBytes
 
 from web3 import AsyncWeb3, Web3
 from web3.contract.async_contract import AsyncContract
 from web3.types import TxParams, _Hash32, TxData, TxReceipt
-from web3.middleware.geth_poa import geth_poa_middleware
 from eth_account.datastructures import SignedTransaction
 
-from .models import TokenAmount, CommonValue, TxArgs
+from .models import TokenAmount, CommonValue, TxArgs, Network
 from .exceptions import TransactionException, GasTooHigh
+from .tokens import TokenCache
+from .fees import FeeOracle
+from .nonces import NonceManager
+from .decoder import Decoder
+from .receipts import ReceiptWatcher
+from .signing import SigningService
 from .types import Contract, Address, Amount, GasPrice, GasLimit
 
 if TYPE_CHECKING:
@@ -35,13 +42,13 @@ class Tx:
     async def parse_params(self, client: Client) -> dict[str, Any]:
         tx_data: TxData = await client.w3.eth.get_transaction(transaction_hash=self.hash)
         self.params = {
-            'chainId': client.network.chain_id,
+            'chainId': await client.network.get_chain_id(),
             'nonce': int(tx_data.get('nonce')),
             'gasPrice': int(tx_data.get('gasPrice')),
             'gas': int(tx_data.get('gas')),
             'from': tx_data.get('from'),
             'to': tx_data.get('to'),
-            'data': tx_data.get('data'),
+            'data': tx_data.get('input'),
             'value': int(tx_data.get('value')),
         }
         return self.params
@@ -49,16 +56,24 @@ class Tx:
     async def wait_for_receipt(self, client: Client, timeout: int | float = 120,
                                poll_latency: float = 0.1) -> dict[str, Any]:
 
-        self.receipt = client.transactions.wait_for_receipt(
+        self.receipt = await client.transactions.wait_for_receipt(
             w3=client.w3,
             tx_hash=self.hash,
             timeout=timeout,
-            poll_latency=poll_latency
+            poll_latency=poll_latency,
+            network=client.network
         )
         return self.receipt
 
-    async def decode_input_data(self):
-        pass
+    async def decode_input_data(self, client: Client | None = None) -> dict[str, Any] | None:
+        """Decode the transaction input, sets `function_identifier` and `input_data`."""
+        if not self.params.get('data') and client:
+            await self.parse_params(client=client)
+
+        decoded = await Decoder.decode(self.params.get('data') or b'')
+        if decoded:
+            self.function_identifier, self.input_data = decoded
+        return self.input_data
 
     async def cancel(self):
         pass
@@ -67,6 +82,48 @@ class Tx:
         pass
 
 
+class TxTemplate:
+    """
+    Gas limit of a repeated operation (the same contract and function), estimated once and then reused.
+
+    The limit is the highest estimate seen times `gas_multiplier`, it is estimated again after `ttl` seconds.
+    """
+    _templates: dict[tuple, TxTemplate] = {}
+
+    def __init__(self, gas_multiplier: float = 1.2, ttl: float = 10 * 60) -> None:
+        self.gas_multiplier = gas_multiplier
+        self.ttl = ttl
+        self._gas: int | None = None
+        self._estimated_at: float = 0
+
+    @classmethod
+    def get(cls, network: Network, tx_params: TxParams, **kwargs) -> TxTemplate:
+        """Get a shared template for the contract and function of `tx_params` on a network."""
+        data = HexBytes(tx_params.get('data') or b'')
+        key = (network.name, str(tx_params.get('to')).lower(), bytes(data[:4]))
+        if key not in cls._templates:
+            cls._templates[key] = cls(**kwargs)
+        return cls._templates[key]
+
+    @property
+    def gas(self) -> int | None:
+        if self._gas and time.monotonic() - self._estimated_at < self.ttl:
+            return self._gas
+        return None
+
+    def remember_gas(self, estimate: int) -> None:
+        self._gas = max(int(estimate * self.gas_multiplier), self.gas or 0)
+        self._estimated_at = time.monotonic()
+
+    def reset(self) -> None:
+        self._gas = None
+
+    @staticmethod
+    def is_gas_error(err: Exception) -> bool:
+        message = str(err).lower()
+        return 'out of gas' in message or 'intrinsic gas' in message or 'gas too low' in message
+
+
 class Transactions:
     def __init__(self, client: Client) -> None:
         self.client = client
@@ -76,29 +133,18 @@ class Transactions:
         gas = await self.client.w3.eth.gas_price
         return TokenAmount(amount=gas, wei=True)
 
-    async def max_priority_fee(self, block: dict | None = None) -> TokenAmount:
-        w3 = Web3(Web3.HTTPProvider(self.client.network.rpc))
-        w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-
-        if not block:
-            block = w3.eth.get_block('latest')
-
-        block_number = block['number']
-        latest_block_transactions_count = w3.eth.get_block_transaction_count(block_number)
-        max_priority_fee_per_gas_lst = []
-        for i in range(latest_block_transactions_count):  # пробегаемся по всем транзакциям в блоке
-            try:
-                transaction = w3.eth.get_transaction_by_block(block_number, i)
-                if transaction.get('maxPriorityFeePerGas'):
-                    max_priority_fee_per_gas_lst.append(transaction['maxPriorityFeePerGas'])
-            except:
-                continue
-
-        if not max_priority_fee_per_gas_lst:
-            max_priority_fee_per_gas = 0
-        else:
-            max_priority_fee_per_gas_lst.sort()
-            max_priority_fee_per_gas = max_priority_fee_per_gas_lst[len(max_priority_fee_per_gas_lst) // 2]
+    async def max_priority_fee(self, block: dict | None = None, percentile: int = 50) -> TokenAmount:
+        """Медианный priority fee по eth_feeHistory, общий кэш на всю сеть"""
+        oracle = FeeOracle.get(self.client.network)
+        try:
+            max_priority_fee_per_gas = await oracle.priority_fee(
+                w3=self.client.w3,
+                percentile=percentile,
+                block_number=block['number'] if block else None
+            )
+        except Exception:
+            # нода не поддерживает eth_feeHistory
+            return await self.max_priority_fee_()
         return TokenAmount(amount=max_priority_fee_per_gas, wei=True)
 
     async def max_priority_fee_(self) -> TokenAmount:
@@ -110,43 +156,120 @@ class Transactions:
         gas = await self.client.w3.eth.estimate_gas(transaction=tx_params)
         return TokenAmount(amount=gas, wei=True)
 
-    async def auto_add_params(self, tx_params: TxParams) -> TxParams:
-        """Дополнение необходимых параметров для транзакции"""
-        if 'chainId' not in tx_params:
-            tx_params['chainId'] = await self.client.w3.eth.chain_id
+    async def auto_add_params(self, tx_params: TxParams, template: TxTemplate | None = None) -> TxParams:
+        """Дополнение необходимых параметров для транзакции, независимые запросы идут параллельно"""
+        tx_params.setdefault('from', self.client.account.address)
+        fields = {}
 
-        if not tx_params.get('nonce'):
-            tx_params['nonce'] = await self.client.wallet.nonce()
+        if 'chainId' not in tx_params:
+            fields['chainId'] = self.client.network.get_chain_id()
 
         if 'gasPrice' not in tx_params and 'maxFeePerGas' not in tx_params:
-            gas_price = (await self.gas_price()).Wei
             if self.client.network.tx_type == 2:
-                tx_params['maxFeePerGas'] = gas_price
+                fields['fees'] = self.eip1559_fees()
             else:
-                tx_params['gasPrice'] = gas_price
+                fields['gasPrice'] = self.gas_price()
+        elif 'maxFeePerGas' in tx_params and 'maxPriorityFeePerGas' not in tx_params:
+            fields['maxPriorityFeePerGas'] = self.max_priority_fee()
 
-        if 'gasPrice' in tx_params and not int(tx_params['gas']):
-            tx_params['gas'] = (await self.gas_price()).Wei
+        if 'gas' not in tx_params or not int(tx_params['gas']):
+            if template and template.gas:
+                tx_params['gas'] = template.gas
+            else:
+                # газ не зависит от комиссий и nonce, оцениваем параллельно с ними
+                fields['gas'] = self.estimate_gas(tx_params={
+                    key: value for key, value in tx_params.items() if key in ('from', 'to', 'data', 'value')
+                })
+
+        if tx_params.get('nonce') is None:
+            fields['nonce'] = self._peek_nonce()
+
+        values = dict(zip(fields, await asyncio.gather(*fields.values())))
+        for key, value in values.items():
+            if key == 'fees':
+                tx_params['maxFeePerGas'], tx_params['maxPriorityFeePerGas'] = value
+            else:
+                tx_params[key] = value.Wei if isinstance(value, TokenAmount) else value
 
-        if 'maxFeePerGas' in tx_params and 'maxPriorityFeePerGas' not in tx_params:
-            tx_params['maxPriorityFeePerGas'] = (await self.max_priority_fee()).Wei
+        if 'maxPriorityFeePerGas' in values:
             tx_params['maxFeePerGas'] = tx_params['maxFeePerGas'] + tx_params['maxPriorityFeePerGas']
 
-        if 'gas' not in tx_params or not int(tx_params['gas']):
-            tx_params['gas'] = (await self.estimate_gas(tx_params=tx_params)).Wei
+        if template and 'gas' in values:
+            template.remember_gas(values['gas'].Wei)
+            tx_params['gas'] = template.gas
 
         return tx_params
 
+    async def eip1559_fees(self, percentile: int = 50) -> tuple[int, int]:
+        """
+        maxFeePerGas и maxPriorityFeePerGas из закэшированного eth_feeHistory сети
+
+        :return tuple[int, int]: (max fee per gas, max priority fee per gas) in wei.
+        """
+        oracle = FeeOracle.get(self.client.network)
+        oracle.track(percentile)
+        try:
+            history = await oracle.history(w3=self.client.w3)
+            priority_fee = history.rewards[percentile]
+            return 2 * history.base_fee + priority_fee, priority_fee
+        except Exception:
+            # нода не поддерживает eth_feeHistory
+            gas_price, priority_fee = await asyncio.gather(self.gas_price(), self.max_priority_fee_())
+            return gas_price.Wei + priority_fee.Wei, priority_fee.Wei
+
+    async def _peek_nonce(self) -> int:
+        nonce_manager = await self.get_nonce_manager()
+        return await nonce_manager.peek(w3=self.client.w3)
+
     async def sign_transaction(self, tx_params: TxParams) -> SignedTransaction:
         """Подпись транзакции с client eth account"""
         return self.client.w3.eth.account.sign_transaction(
             transaction_dict=tx_params, private_key=self.client.account.key)
 
-    async def sign_and_send(self, tx_params: TxParams):
-        self.auto_add_params(tx_params=tx_params)
-        signed_tx = self.transaction = await self.sign_transaction(tx_params=tx_params)
-        tx_hash = self.client.w3.eth.send_raw_transaction(transaction=signed_tx)
-        return Tx(tx_hash=tx_hash, params=tx_params)
+    async def sign_transactions(self, txs: list[TxParams]) -> list[SignedTransaction]:
+        """Подпись пачки транзакций с client eth account в пуле процессов"""
+        return await SigningService.sign_many([(self.client.account.key, tx_params) for tx_params in txs])
+
+    async def get_nonce_manager(self) -> NonceManager:
+        return NonceManager.get(chain_id=await self.client.network.get_chain_id(), address=self.client.account.address)
+
+    async def sign_and_send(self, tx_params: TxParams, template: TxTemplate | None = None) -> Tx:
+        managed_nonce = tx_params.get('nonce') is None
+        nonce_manager = await self.get_nonce_manager()
+        for attempt in range(2):
+            await self.auto_add_params(tx_params=tx_params, template=template)
+            if managed_nonce:
+                # nonce занимаем только перед самой отправкой, чтобы ошибка подготовки не оставила дыру
+                tx_params['nonce'] = await nonce_manager.next(w3=self.client.w3)
+            sending = False
+            try:
+                signed_tx = self.transaction = await self.sign_transaction(tx_params=tx_params)
+                sending = True
+                tx_hash = await self.client.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+                return Tx(tx_hash=tx_hash, params=tx_params)
+            except (Exception, asyncio.CancelledError) as err:
+                if not managed_nonce:
+                    raise
+
+                if not sending:
+                    # транзакция не подписалась и точно не ушла в сеть
+                    nonce_manager.release(tx_params['nonce'])
+                    raise
+
+                if NonceManager.is_nonce_error(err) and not attempt:
+                    # локальный nonce разошелся с сетью, синхронизируемся и пробуем еще раз
+                    nonce_manager.reset()
+                    tx_params['nonce'] = None
+                    continue
+
+                if NonceManager.is_rejected(err):
+                    nonce_manager.release(tx_params['nonce'])
+                else:
+                    # нода могла принять транзакцию (таймаут, потерянный ответ, already known), nonce не переиспользуем
+                    nonce_manager.reset()
+                if template and TxTemplate.is_gas_error(err):
+                    template.reset()
+                raise
 
     async def approved_amount(
             self, token: Contract, spender: Contract, owner: Address | None = None
@@ -157,19 +280,20 @@ class Transactions:
         spender, abi = await self.client.contracts.get_contract_attributes(contract=spender)  # контракт свапалки
         if not owner:
             owner = self.client.account.address
-        return TokenAmount(
-            amount=await contract.functions.allowance(
-                owner=owner,
-                spender=spender
-            ).call(),
-            decimals=await self.client.transactions.get_decimals(contract=contract), wei=True
+        amount, decimals = await asyncio.gather(
+            self.client.multicall.call(contract.functions.allowance(owner=owner, spender=spender)),
+            self.client.transactions.get_decimals(contract=contract)
         )
+        return TokenAmount(amount=amount, decimals=decimals, wei=True)
 
     @staticmethod
     async def wait_for_receipt(w3: Web3 | AsyncWeb3, tx_hash: str | _Hash32,
                                timeout: int | float = 120,
-                               poll_latency: float = 0.1) -> dict[str, Any]:
-        """Получение чека транзакции, проверка что она прошла успешно"""
+                               poll_latency: float = 0.1,
+                               network: Network | None = None) -> dict[str, Any]:
+        """Получение чека транзакции, с network ждем через общий ReceiptWatcher сети"""
+        if network:
+            return dict(await ReceiptWatcher.get(network).wait(w3=w3, tx_hash=tx_hash, timeout=timeout))
         return dict(await w3.eth.wait_for_transaction_receipt(
             transaction_hash=tx_hash, timeout=timeout, poll_latency=poll_latency))
 
@@ -180,7 +304,7 @@ class Transactions:
 
         spender: Contract = Web3.to_checksum_address(value=spender)
         contract_addr, _ = await self.client.contracts.get_contract_attributes(contract=token)
-        contract: Contract = await self.client.contracts.default_token(address=contract_addr)
+        contract: Contract = await self.client.contracts.default_token(contract_address=contract_addr)
 
         if not amount:
             amount = CommonValue.InfinityInt
@@ -203,18 +327,46 @@ class Transactions:
         if gas_limit:
             if isinstance(gas_limit, int):
                 gas_limit = TokenAmount(amount=gas_limit, wei=True)
-            tx_params['gas'] = gas_limit
+            tx_params['gas'] = gas_limit.Wei
 
         return await self.sign_and_send(tx_params=tx_params)
 
     async def get_decimals(self, contract: Contract) -> int:
         contract_address, _ = await self.client.contracts.get_contract_attributes(contract=contract)  # контакт токена
+        chain_id = await self.client.network.get_chain_id()
+        token = TokenCache.get(chain_id=chain_id, address=contract_address)
+        if token and token.get('decimals') is not None:
+            return token['decimals']
+
         contract: AsyncContract = await self.client.contracts.default_token(contract_address=contract_address)
-        return await contract.functions.decimals().call()
+        decimals = await self.client.multicall.call(contract.functions.decimals())
+        TokenCache.set(chain_id=chain_id, address=contract_address, decimals=decimals)
+        return decimals
+
+    async def get_token_info(self, contract: Contract) -> dict:
+        """Decimals, symbol and name of a token, fetched from chain only once."""
+        contract_address, _ = await self.client.contracts.get_contract_attributes(contract=contract)
+        chain_id = await self.client.network.get_chain_id()
+        token = TokenCache.get(chain_id=chain_id, address=contract_address) or {}
+        if all(token.get(field) is not None for field in ('decimals', 'symbol', 'name')):
+            return token
+
+        contract: AsyncContract = await self.client.contracts.default_token(contract_address=contract_address)
+        decimals, symbol, name = await asyncio.gather(
+            self.client.multicall.call(contract.functions.decimals()),
+            self.client.multicall.call(contract.functions.symbol()),
+            self.client.multicall.call(contract.functions.name())
+        )
+        return TokenCache.set(chain_id=chain_id, address=contract_address,
+                              decimals=decimals, symbol=symbol, name=name)
 
     async def sign_message(self):
         pass
 
     @staticmethod
-    async def decode_input_data(self):
-        pass
+    async def decode_input_data(input_data: str | bytes, abi: list | str | None = None
+                                ) -> tuple[str, dict[str, Any]] | None:
+        """Decode calldata into the function name and its arguments"""
+        if abi:
+            Decoder.register_abi(abi)
+        return await Decoder.decode(input_data)
@@ -0,0 +1,182 @@
+import json
+import time
+import asyncio
+from typing import Any
+
+import aiohttp
+from web3 import Web3
+from web3.types import RPCEndpoint, RPCResponse
+
+from .proxies import ProxyChecker
+from .sessions import LoopBoundSession
+from .metrics import RPCMetrics, endpoint_label
+
+
+class Transport:
+    """A keep-alive aiohttp connection pool for one (rpc, proxy) pair, shared by all clients using it."""
+
+    def __init__(self,
+                 rpc: str,
+                 proxy: str | None = None,
+                 limit: int = 100,
+                 limit_per_host: int = 0,
+                 keepalive_timeout: float = 60,
+                 timeout: float = 30) -> None:
+        self.rpc = rpc
+        self.proxy = proxy
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session = LoopBoundSession(self._create_session)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # сессия привязана к event loop, поэтому создаем ее лениво внутри loop
+        return self._session.get()
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def post(self, data: bytes, headers: dict | None = None) -> bytes:
+        async with self.session.post(self.rpc, data=data, headers=headers, proxy=self.proxy) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+
+    async def close(self) -> None:
+        await self._session.close()
+
+
+class TransportRegistry:
+    """Hands out one shared Transport per (rpc, proxy) key."""
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 60
+    timeout: float = 30
+
+    _transports: dict[tuple[str, str | None], Transport] = {}
+
+    @classmethod
+    def configure(cls,
+                  limit: int | None = None,
+                  limit_per_host: int | None = None,
+                  keepalive_timeout: float | None = None,
+                  timeout: float | None = None) -> None:
+        """Set connection limits for transports created after this call."""
+        if limit is not None:
+            cls.limit = limit
+        if limit_per_host is not None:
+            cls.limit_per_host = limit_per_host
+        if keepalive_timeout is not None:
+            cls.keepalive_timeout = keepalive_timeout
+        if timeout is not None:
+            cls.timeout = timeout
+
+    @classmethod
+    def get(cls, rpc: str, proxy: str | None = None) -> Transport:
+        key = (rpc, proxy)
+        if key not in cls._transports:
+            cls._transports[key] = Transport(
+                rpc=rpc,
+                proxy=proxy,
+                limit=cls.limit,
+                limit_per_host=cls.limit_per_host,
+                keepalive_timeout=cls.keepalive_timeout,
+                timeout=cls.timeout,
+            )
+        return cls._transports[key]
+
+    @classmethod
+    async def close_all(cls) -> None:
+        """
+        Close every pooled connection. Call once on shutdown.
+
+        Transports stay registered, since providers keep a reference to theirs: a transport used after this call
+        opens a new session.
+        """
+        await asyncio.gather(*(transport.close() for transport in cls._transports.values()))
+
+
+class HTTPProvider(Web3.AsyncHTTPProvider):
+    """AsyncHTTPProvider that sends requests through a shared Transport with per-client headers."""
+
+    def __init__(self,
+                 endpoint_uri: str,
+                 proxy: str | None = None,
+                 headers: dict | None = None,
+                 check_proxy: bool = False,
+                 network: str | None = None) -> None:
+        super().__init__(endpoint_uri=endpoint_uri, request_kwargs={'headers': headers or {}})
+        self.network = network or 'unknown'
+        self.proxy = proxy
+        self.headers = headers or self.get_request_headers()
+        self.check_proxy = bool(proxy) and check_proxy
+        self.transport = TransportRegistry.get(rpc=endpoint_uri, proxy=proxy)
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        request_data = self.encode_rpc_request(method, params)
+        raw_response = await self._post(data=request_data, method=method)
+        return self.decode_rpc_response(raw_response)
+
+    async def make_batch_request(self, requests: list[tuple[str, list]]) -> list[RPCResponse]:
+        """Send several calls in one JSON-RPC batch array, responses are returned in request order."""
+        payload = [
+            {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': i}
+            for i, (method, params) in enumerate(requests)
+        ]
+        raw_response = await self._post(data=json.dumps(payload).encode())
+        response = self.decode_rpc_response(raw_response)
+        if isinstance(response, dict):
+            # нода отклонила весь batch одной ошибкой
+            return [response] * len(requests)
+
+        responses = {item.get('id'): item for item in response}
+        return [responses.get(i, {'error': {'message': 'No response in batch'}}) for i in range(len(requests))]
+
+    async def _post(self, data: bytes, method: str | None = None) -> bytes:
+        """Send an encoded request, `method` is None for batches."""
+        await self._ensure_proxy()
+        return await self._send(self.transport, data=data, method=method)
+
+    async def _send(self, transport: Transport, data: bytes, method: str | None = None) -> bytes:
+        """Post through a transport, reporting the request to RPCMetrics."""
+        if not RPCMetrics.enabled:
+            return await transport.post(data=data, headers=self.headers)
+
+        started = time.monotonic()
+        try:
+            response = await transport.post(data=data, headers=self.headers)
+        except asyncio.CancelledError:
+            # проигравший запрос при хэджировании, это не ошибка endpoint'а
+            raise
+        except Exception:
+            self._record(transport, data=data, method=method, started=started, response=None)
+            raise
+        self._record(transport, data=data, method=method, started=started, response=response)
+        return response
+
+    def _record(self, transport: Transport, data: bytes, method: str | None, started: float,
+                response: bytes | None) -> None:
+        RPCMetrics.record(
+            network=self.network,
+            endpoint=endpoint_label(transport.rpc),
+            method=method or 'batch',
+            latency=time.monotonic() - started,
+            # дешевая проверка без разбора JSON, batch считается ошибочным, если ошибка хотя бы в одном ответе
+            error=response is None or b'"error"' in response,
+            bytes_sent=len(data),
+            bytes_received=len(response or b''),
+        )
+
+    async def _ensure_proxy(self) -> None:
+        if self.check_proxy:
+            await ProxyChecker.ensure(self.proxy)
+            self.check_proxy = False
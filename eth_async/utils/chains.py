@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import asyncio
+
+import aiohttp
+
+
+class ChainList:
+    """
+    chains.json from chainid.network indexed by chainId.
+
+    The list is downloaded on first lookup and stored on disk, it is downloaded again only when older than `ttl`.
+    """
+    url: str = 'https://chainid.network/chains.json'
+    path: str | None = None
+    ttl: float = 7 * 24 * 60 * 60
+
+    _index: dict[int, dict] | None = None
+    _lock: asyncio.Lock | None = None
+
+    @classmethod
+    def configure(cls, path: str | None = None, ttl: float | None = None) -> None:
+        cls.path = path
+        if ttl is not None:
+            cls.ttl = ttl
+        cls._index = None
+
+    @classmethod
+    async def get(cls, chain_id: int) -> dict | None:
+        """Get chain info (name, nativeCurrency, explorers) by chain id."""
+        if cls._index is None:
+            if cls._lock is None:
+                cls._lock = asyncio.Lock()
+            async with cls._lock:
+                if cls._index is None:
+                    cls._index = await cls._load()
+        return cls._index.get(chain_id)
+
+    @classmethod
+    async def _load(cls) -> dict[int, dict]:
+        stale = None
+        if cls.path and os.path.exists(cls.path):
+            try:
+                with open(cls.path) as file:
+                    stale = {int(chain_id): chain for chain_id, chain in json.load(file).items()}
+                if time.time() - os.path.getmtime(cls.path) < cls.ttl:
+                    return stale
+            except (OSError, ValueError):
+                stale = None
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(cls.url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+                    resp.raise_for_status()
+                    chains = await resp.json(content_type=None)
+        except Exception:
+            if stale is not None:
+                return stale
+            raise
+
+        index = {
+            chain['chainId']: {
+                'name': chain.get('name'),
+                'nativeCurrency': chain.get('nativeCurrency'),
+                'explorers': chain.get('explorers'),
+            }
+            for chain in chains
+        }
+        if cls.path:
+            os.makedirs(os.path.dirname(cls.path) or '.', exist_ok=True)
+            tmp_path = f'{cls.path}.tmp'
+            with open(tmp_path, 'w') as file:
+                json.dump(index, file)
+            os.replace(tmp_path, cls.path)
+        return index
@@ -0,0 +1,19 @@
+import random
+
+from fake_useragent import UserAgent
+
+
+_pool: list[str] = []
+
+
+def preload_user_agents(size: int = 100) -> list[str]:
+    """Sample `size` chrome user agents once, later calls of random_user_agent pick from this pool."""
+    user_agent = UserAgent()
+    _pool[:] = list({user_agent.chrome for _ in range(size)})
+    return _pool
+
+
+def random_user_agent() -> str:
+    if not _pool:
+        preload_user_agents()
+    return random.choice(_pool)
@@ -20,6 +20,6 @@ async def async_get(url: str, headers: dict | None = None, **kwargs) -> dict | N
     async with aiohttp.ClientSession(headers=headers) as session:
         async with session.get(url=url, **kwargs) as resp:
             if resp.status <= 201:
-                return resp.json()
+                return await resp.json()
 
             raise HTTPException(response=resp, status_code=resp.status)
@@ -1,10 +1,12 @@
 from __future__ import annotations
+import asyncio
 from typing import TYPE_CHECKING
 
 from web3 import Web3
 from eth_typing import ChecksumAddress
 
-from .models import TokenAmount
+from .models import TokenAmount, TokenAmountArray
+from .exceptions import BatchRequestException
 from eth_async.types import Contract
 
 
@@ -29,12 +31,90 @@ class Wallet:
                                decimals=decimals,
                                wei=True)
         token_address = Web3.to_checksum_address(token_address)
-        contract: Contract = self.client.contracts.default_token(token_address)
-        return TokenAmount(amount=await contract.functions.balanceOf(address).call(),
-                           decimals=await self.client.transactions.get_decimals(contract=contract),
-                           wei=True)
+        contract: Contract = await self.client.contracts.default_token(token_address)
+        amount, decimals = await asyncio.gather(
+            self.client.multicall.call(contract.functions.balanceOf(address)),
+            self.client.transactions.get_decimals(contract=contract)
+        )
+        return TokenAmount(amount=amount, decimals=decimals, wei=True)
 
     async def nonce(self, address: ChecksumAddress | None = None) -> int:
         if not address:
             address = self.client.account.address
         return await self.client.w3.eth.get_transaction_count(address)
+
+    async def balances(self,
+                       addresses: list[str | ChecksumAddress],
+                       token: Contract | None = None,
+                       decimals: int = 18,
+                       batch_size: int = 100,
+                       retries: int = 3,
+                       as_array: bool = False) -> list[TokenAmount] | TokenAmountArray:
+        """
+        Get balances of many addresses using JSON-RPC batches.
+
+        :param as_array: return a TokenAmountArray instead of a list, no TokenAmount objects are created.
+        :return list[TokenAmount] | TokenAmountArray: balances in the order of the passed addresses.
+        """
+        addresses = [Web3.to_checksum_address(value=address) for address in addresses]
+        if not token:
+            requests = [('eth_getBalance', [address, 'latest']) for address in addresses]
+        else:
+            contract_address, _ = await self.client.contracts.get_contract_attributes(contract=token)
+            contract = await self.client.contracts.default_token(contract_address=contract_address)
+            decimals = await self.client.transactions.get_decimals(contract=contract)
+            requests = [
+                ('eth_call', [{'to': contract.address, 'data': contract.encodeABI('balanceOf', args=(address,))},
+                              'latest'])
+                for address in addresses
+            ]
+
+        results = await self.batch_request(requests=requests, batch_size=batch_size, retries=retries)
+        if as_array:
+            return TokenAmountArray((int(result, 16) for result in results), decimals=decimals)
+        return [TokenAmount(amount=int(result, 16), decimals=decimals, wei=True) for result in results]
+
+    async def nonces(self,
+                     addresses: list[str | ChecksumAddress],
+                     batch_size: int = 100,
+                     retries: int = 3) -> list[int]:
+        """Get nonces of many addresses using JSON-RPC batches, in the order of the passed addresses."""
+        requests = [
+            ('eth_getTransactionCount', [Web3.to_checksum_address(value=address), 'latest'])
+            for address in addresses
+        ]
+        results = await self.batch_request(requests=requests, batch_size=batch_size, retries=retries)
+        return [int(result, 16) for result in results]
+
+    async def batch_request(self,
+                            requests: list[tuple[str, list]],
+                            batch_size: int = 100,
+                            retries: int = 3) -> list:
+        """Send requests in batches of `batch_size`, resending only failed entries up to `retries` times."""
+        results = [None] * len(requests)
+        pending = list(range(len(requests)))
+        errors = {}
+        for _ in range(retries + 1):
+            failed = []
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                try:
+                    responses = await self.client.w3.provider.make_batch_request([requests[i] for i in chunk])
+                except Exception as err:
+                    failed.extend(chunk)
+                    errors.update({i: str(err) for i in chunk})
+                    continue
+
+                for i, response in zip(chunk, responses):
+                    if 'result' in response and response['result'] is not None:
+                        results[i] = response['result']
+                    else:
+                        failed.append(i)
+                        errors[i] = response.get('error')
+
+            pending = failed
+            if not pending:
+                return results
+
+        raise BatchRequestException(
+            f"{len(pending)} of {len(requests)} batch requests failed, first error: {errors[pending[0]]}")
@@ -0,0 +1,274 @@
+from __future__ import annotations
+import json
+import asyncio
+from typing import Any, Callable
+
+import aiohttp
+from web3._utils.method_formatters import block_formatter, log_entry_formatter
+
+from .exceptions import WebSocketException
+
+
+_CLOSED = object()
+
+FORMATTERS: dict[str, Callable] = {
+    'newHeads': block_formatter,
+    'logs': log_entry_formatter,
+}
+
+
+class Subscription:
+    """
+    An `eth_subscribe` subscription read as an async iterator.
+
+    Survives reconnects: the connection subscribes again and the iteration goes on. When the consumer is slower
+    than the chain, the oldest notifications are dropped once `max_queue` are waiting.
+    """
+
+    def __init__(self, connection: WebSocketConnection, kind: str, params: list, max_queue: int = 1000) -> None:
+        self.connection = connection
+        self.kind = kind
+        self.params = params
+        self.id: str | None = None
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._closed = False
+
+    def __aiter__(self) -> Subscription:
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._closed and self._queue.empty():
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+    async def __aenter__(self) -> Subscription:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.unsubscribe()
+
+    async def unsubscribe(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._push(_CLOSED)
+        await self.connection.unsubscribe(self)
+
+    def _push(self, item: Any) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def _notify(self, result: Any) -> None:
+        formatter = FORMATTERS.get(self.kind)
+        self._push(formatter(result) if formatter else result)
+
+
+class WebSocketConnection:
+    """
+    One persistent JSON-RPC WebSocket connection per URL, shared by all clients of a network.
+
+    Connects on first use, reconnects with backoff when the connection drops and subscribes again to every live
+    subscription. Requests in flight during a drop fail with WebSocketException.
+    """
+    reconnect_delay: float = 1
+    max_reconnect_delay: float = 30
+    request_timeout: float = 30
+
+    _connections: dict[tuple[str, str | None], WebSocketConnection] = {}
+
+    def __init__(self, url: str, proxy: str | None = None, heartbeat: float = 30) -> None:
+        self.url = url
+        self.proxy = proxy
+        self.heartbeat = heartbeat
+        self.reconnects = 0
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._connected: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._next_id = 0
+        self._requests: dict[int, asyncio.Future] = {}
+        self._subscriptions: dict[str, Subscription] = {}
+        self._early: dict[str, list] = {}  # уведомления, пришедшие раньше, чем мы узнали id подписки
+        self._live: list[Subscription] = []
+
+    @classmethod
+    def get(cls, url: str, proxy: str | None = None) -> WebSocketConnection:
+        key = (url, proxy)
+        if key not in cls._connections:
+            cls._connections[key] = cls(url=url, proxy=proxy)
+        return cls._connections[key]
+
+    @classmethod
+    async def close_all(cls) -> None:
+        connections = list(cls._connections.values())
+        cls._connections.clear()
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+    @property
+    def connected(self) -> bool:
+        return bool(self._connected and self._connected.is_set())
+
+    async def request(self, method: str, params: list | None = None) -> Any:
+        """Send a JSON-RPC request over the socket and return its result."""
+        await self._ensure_connected()
+        return await self._send(method, params or [])
+
+    async def subscribe(self, kind: str, *params: Any, max_queue: int = 1000) -> Subscription:
+        """
+        Subscribe to `newHeads` or `logs` (params: a filter dict with address and topics) or any other kind.
+
+        :return Subscription: an async iterator of notifications, block headers and logs are formatted by web3.
+        """
+        subscription = Subscription(connection=self, kind=kind, params=list(params), max_queue=max_queue)
+        await self._ensure_connected()
+        await self._subscribe(subscription)
+        self._live.append(subscription)
+        return subscription
+
+    async def subscribe_new_heads(self, max_queue: int = 1000) -> Subscription:
+        return await self.subscribe('newHeads', max_queue=max_queue)
+
+    async def subscribe_logs(self, address: str | list[str] | None = None, topics: list | None = None,
+                             max_queue: int = 1000) -> Subscription:
+        log_filter = {}
+        if address:
+            log_filter['address'] = address
+        if topics:
+            log_filter['topics'] = topics
+        return await self.subscribe('logs', log_filter, max_queue=max_queue)
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self._live:
+            self._live.remove(subscription)
+        subscription_id = subscription.id
+        self._subscriptions.pop(subscription_id, None)
+        if subscription_id and self.connected:
+            try:
+                await self._send('eth_unsubscribe', [subscription_id])
+            except Exception:
+                pass
+
+    async def close(self) -> None:
+        for subscription in list(self._live):
+            subscription._closed = True
+            subscription._push(_CLOSED)
+        self._live.clear()
+        self._subscriptions.clear()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _ensure_connected(self) -> None:
+        loop = asyncio.get_running_loop()
+        if not self._task or self._task.done() or self._task.get_loop() is not loop:
+            self._connected = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        await asyncio.wait_for(self._connected.wait(), timeout=self.request_timeout)
+
+    async def _subscribe(self, subscription: Subscription) -> None:
+        subscription.id = await self._send('eth_subscribe', [subscription.kind, *subscription.params])
+        self._subscriptions[subscription.id] = subscription
+        for result in self._early.pop(subscription.id, []):
+            subscription._notify(result)
+
+    async def _send(self, method: str, params: list) -> Any:
+        if self._ws is None:
+            raise WebSocketException(f'WebSocket connection to {self.url} is not established')
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._requests[request_id] = future
+        try:
+            request = {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+            await self._ws.send_str(json.dumps(request))
+            return await asyncio.wait_for(future, timeout=self.request_timeout)
+        finally:
+            self._requests.pop(request_id, None)
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        was_connected = False
+        while True:
+            try:
+                if self._session is None or self._session.closed:
+                    self._session = aiohttp.ClientSession()
+                async with self._session.ws_connect(self.url, proxy=self.proxy, heartbeat=self.heartbeat) as ws:
+                    self._ws = ws
+                    self._connected.set()
+                    delay = self.reconnect_delay
+                    if was_connected:
+                        self.reconnects += 1
+                    was_connected = True
+                    resubscribe = asyncio.create_task(self._resubscribe())
+                    try:
+                        async for message in ws:
+                            if message.type == aiohttp.WSMsgType.TEXT:
+                                self._dispatch(json.loads(message.data))
+                            elif message.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.ERROR):
+                                break
+                    finally:
+                        resubscribe.cancel()
+            except asyncio.CancelledError:
+                self._disconnected()
+                raise
+            except Exception:
+                pass
+
+            # соединение оборвалось, переподключаемся с растущей паузой
+            self._disconnected()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _resubscribe(self) -> None:
+        # id подписок живут только в рамках соединения
+        self._subscriptions.clear()
+        self._early.clear()
+        for subscription in list(self._live):
+            try:
+                await self._subscribe(subscription)
+            except Exception:
+                # подписка восстановится при следующем переподключении
+                subscription.id = None
+
+    def _disconnected(self) -> None:
+        self._ws = None
+        if self._connected:
+            self._connected.clear()
+        for future in self._requests.values():
+            if not future.done():
+                future.set_exception(WebSocketException(f'WebSocket connection to {self.url} was lost'))
+
+    def _dispatch(self, message: dict | list) -> None:
+        if isinstance(message, list):
+            for item in message:
+                self._dispatch(item)
+            return
+
+        if message.get('method') == 'eth_subscription':
+            params = message.get('params', {})
+            subscription_id = params.get('subscription')
+            subscription = self._subscriptions.get(subscription_id)
+            if subscription:
+                if not subscription._closed:
+                    subscription._notify(params.get('result'))
+            elif len(self._early.setdefault(subscription_id, [])) < 100:
+                self._early[subscription_id].append(params.get('result'))
+            return
+
+        future = self._requests.get(message.get('id'))
+        if not future or future.done():
+            return
+        if 'error' in message:
+            future.set_exception(WebSocketException(f"{message['error'].get('message')}"))
+        else:
+            future.set_result(message.get('result'))
@@ -1,23 +1,38 @@
 import asyncio
 import os
+from typing import Iterable
 
 from dotenv import load_dotenv
 
 from tasks.mute import Mute
+from tasks.runner import Runner
 from eth_async.client import Client
+from eth_async.keystore import KeyStore
 from eth_async.models import Networks, TokenAmount
+from data.config import KEYSTORE_PATH
 
 
-async def main(pk):
-    client = Client(private_key=pk, network=Networks.ZkSync)
-
-    mute = Mute(client=client)
-
+async def main(private_keys: Iterable[str]):
     amount = TokenAmount(amount=0.001)
-    print(await mute.swap_eth_to_usdc(amount=amount))
+
+    runner = Runner(
+        task=lambda client: Mute(client=client).swap_eth_to_usdc(amount=amount),
+        network=Networks.ZkSync,
+        jitter=(0, 5),
+        sink=print
+    )
+    try:
+        await runner.run(private_keys)
+    finally:
+        await Client.close_all()
 
 if __name__ == "__main__":
     load_dotenv()
-    PRIMARY_KEY = os.getenv("PRIMARY_KEY")
-
-    asyncio.run(main(pk=PRIMARY_KEY))
+    KEYSTORE_PASSWORD = os.getenv("KEYSTORE_PASSWORD")
+    if KEYSTORE_PASSWORD and os.path.exists(KEYSTORE_PATH):
+        # ключи расшифровываются по одному, когда Runner до них доходит
+        with KeyStore(path=KEYSTORE_PATH, password=KEYSTORE_PASSWORD) as key_store:
+            asyncio.run(main(private_keys=key_store))
+    else:
+        PRIVATE_KEYS = os.getenv("PRIVATE_KEYS") or os.getenv("PRIMARY_KEY")
+        asyncio.run(main(private_keys=PRIVATE_KEYS.split(',')))
@@ -1,10 +1,9 @@
-import asyncio
-import aiohttp
-
-from web3.contract.async_contract import AsyncContract
-
 from eth_async.client import Client
 from eth_async.models import TokenAmount
+from eth_async.quoter import Quoter
+from eth_async.types import Contract
+
+from .prices import PriceFeed
 
 
 class Base:
@@ -13,21 +12,25 @@ class Base:
 
     @staticmethod
     async def get_token_price(token_symbol: str = 'ETH', second_token: str = "USDT") -> float | None:
-        token_symbol, second_token = token_symbol.upper(), second_token.upper()
-        url = f'https://api.binance.com/api/v3/depth?limit=1&symbol={token_symbol}{second_token}'
-        for _ in range(5):
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url) as r:
-                        if r.status != 200:
-                            return
-                        result_dict = await r.json()
-                        if 'asks' not in result_dict:
-                            return
-                        return float(result_dict['asks'][0][0])
-            except:
-                await asyncio.sleep(5)
-        raise ValueError(f"Can`t get {token_symbol + second_token} price | Binance")
+        return await PriceFeed.get_price(token_symbol=token_symbol, second_token=second_token)
+
+    async def get_amount_out_min(self, router: Contract, amount: TokenAmount, path: list[Contract],
+                                 slippage: float, price_symbol: str = 'ETH') -> TokenAmount:
+        """
+        amountOutMin для свапа `amount` по `path` с учетом `slippage` в процентах
+
+        Котировка берется у роутера (getAmountsOut через multicall, кэш на блок), а если в ABI роутера нет
+        getAmountsOut - по цене `price_symbol` с Binance.
+        """
+        decimals = await self.client.transactions.get_decimals(contract=path[-1])
+        if Quoter.supports(router):
+            quoter = Quoter(client=self.client, router=router)
+            return await quoter.amount_out_min(amount_in=amount, path=path, slippage=slippage, decimals=decimals)
+
+        price = await self.get_token_price(token_symbol=price_symbol)
+        if price is None:
+            raise ValueError(f'Binance has no {price_symbol}USDT price to compute amountOutMin')
+        return TokenAmount(amount=price * float(amount.Ether) * (1 - slippage / 100), decimals=decimals)
 
     async def approve_interface(self, token_address, spender, amount: TokenAmount | None = None) -> bool:
         """Аппрувнуто ли переданное количество"""
@@ -57,7 +60,7 @@ class Base:
         return True if receipt else False
 
     async def get_token_info(self, contract_address):
-        contract: AsyncContract = await self.client.contracts.default_token(contract_address)
-        print('name', await contract.functions.name().call())
-        print('symbol', await contract.functions.symbol().call())
-        print('decimals', await contract.functions.decimals().call())
+        token = await self.client.transactions.get_token_info(contract=contract_address)
+        print('name', token['name'])
+        print('symbol', token['symbol'])
+        print('decimals', token['decimals'])
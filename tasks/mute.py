@@ -4,6 +4,7 @@ from web3.types import TxParams
 
 from .base import Base
 from eth_async.models import TokenAmount, TxArgs
+from eth_async.transactions import TxTemplate
 from data.models import Contracts
 
 
@@ -19,10 +20,11 @@ class Mute(Base):
 
         contract = await self.client.contracts.get(contract_address=Contracts.ZKSYNC_MUTE)
 
-        eth_price = await self.get_token_price(token_symbol='ETH')
-        amount_out_min = TokenAmount(
-            amount=float(amount.Ether) * eth_price * (1 - slippage / 100),
-            decimals=await self.client.transactions.get_decimals(contract=to_token)
+        amount_out_min = await self.get_amount_out_min(
+            router=Contracts.ZKSYNC_MUTE,
+            amount=amount,
+            path=[Contracts.ZKSYNC_WETH, to_token],
+            slippage=slippage
         )
 
         tx_args = TxArgs(
@@ -44,9 +46,12 @@ class Mute(Base):
         gas = await self.client.transactions.estimate_gas(tx_params=tx_params)
 
         if gas:
+            # оценка этого кошелька остается проверкой свапа, а отправка возьмет газ из шаблона без повторной оценки
+            template = TxTemplate.get(network=self.client.network, tx_params=tx_params)
+            template.remember_gas(gas.Wei)
             return f'{amount.Ether} ETH Successfully swapped to USDC via Mute | Gas: {gas.Wei}'
 
-        # tx = await self.client.transactions.sign_and_send(tx_params=tx_params)  # auto_add_params внутри
+        # tx = await self.client.transactions.sign_and_send(tx_params=tx_params, template=template)
         # receipt = await tx.wait_for_receipt(client=self.client, timeout=300)
         # if receipt:
         #     return f'{amount.Ether} ETH Successfully swapped to {to_token_name} via Mute: {tx.hash.hex()}'
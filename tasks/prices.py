@@ -0,0 +1,150 @@
+import json
+import time
+import asyncio
+
+import aiohttp
+
+from eth_async.client import Client
+from eth_async.sessions import LoopBoundSession
+
+
+RETRY_STATUSES = (418, 429)  # 418 - Binance забанил IP за игнорирование 429
+
+
+class PriceFeed:
+    """
+    Binance ask prices shared by all tasks.
+
+    Quotes are cached for `ttl` seconds, concurrent requests for the same pair share one HTTP request, and
+    `start_stream` can keep chosen pairs fresh from the bookTicker websocket. `base_url` and `ws_url`
+    can point to a local stand-in server.
+    """
+    base_url: str = 'https://api.binance.com'
+    ws_url: str = 'wss://stream.binance.com:9443'
+    ttl: float = 5
+    retries: int = 5
+    retry_delay: float = 5
+
+    _quotes: dict[str, tuple[float, float]] = {}  # symbol -> (price, monotonic time)
+    _requests: dict[str, asyncio.Task] = {}
+    _stream: asyncio.Task | None = None
+    _session = LoopBoundSession(lambda: aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)))
+
+    @classmethod
+    def configure(cls,
+                  base_url: str | None = None,
+                  ws_url: str | None = None,
+                  ttl: float | None = None,
+                  retries: int | None = None,
+                  retry_delay: float | None = None) -> None:
+        if base_url is not None:
+            cls.base_url = base_url
+        if ws_url is not None:
+            cls.ws_url = ws_url
+        if ttl is not None:
+            cls.ttl = ttl
+        if retries is not None:
+            cls.retries = retries
+        if retry_delay is not None:
+            cls.retry_delay = retry_delay
+
+    @classmethod
+    async def get_price(cls, token_symbol: str = 'ETH', second_token: str = 'USDT',
+                        max_staleness: float | None = None) -> float | None:
+        """
+        Get the best ask price of a pair.
+
+        :param max_staleness: the max age of a cached quote in seconds, `ttl` by default.
+        :return float | None: the price or None if Binance doesn't know the pair.
+        """
+        symbol = f'{token_symbol}{second_token}'.upper()
+        max_staleness = cls.ttl if max_staleness is None else max_staleness
+        quote = cls._quotes.get(symbol)
+        if quote and time.monotonic() - quote[1] <= max_staleness:
+            return quote[0]
+
+        task = cls._requests.get(symbol)
+        if not task or task.done():
+            task = cls._requests[symbol] = asyncio.ensure_future(cls._fetch(symbol))
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def start_stream(cls, pairs: list[tuple[str, str]]) -> None:
+        """Keep the prices of `pairs` fresh from the websocket until stop_stream is called."""
+        await cls.stop_stream()
+        symbols = [f'{token_symbol}{second_token}'.upper() for token_symbol, second_token in pairs]
+        cls._stream = asyncio.create_task(cls._listen(symbols))
+
+    @classmethod
+    async def stop_stream(cls) -> None:
+        if cls._stream:
+            cls._stream.cancel()
+            await asyncio.gather(cls._stream, return_exceptions=True)
+            cls._stream = None
+
+    @classmethod
+    async def close(cls) -> None:
+        await cls.stop_stream()
+        await cls._session.close()
+
+    @classmethod
+    def _get_session(cls) -> aiohttp.ClientSession:
+        return cls._session.get()
+
+    @classmethod
+    async def _fetch(cls, symbol: str) -> float | None:
+        url = f'{cls.base_url}/api/v3/depth'
+        last_error = None
+        try:
+            for attempt in range(cls.retries):
+                delay = cls.retry_delay * 2 ** attempt
+                try:
+                    async with cls._get_session().get(url, params={'limit': 1, 'symbol': symbol}) as r:
+                        if r.status in RETRY_STATUSES or r.status >= 500:
+                            # rate limit или сбой Binance: ждем, сколько просят, или с растущей паузой
+                            last_error = f'HTTP {r.status}'
+                            retry_after = r.headers.get('Retry-After')
+                            if retry_after and retry_after.isdigit():
+                                delay = max(delay, int(retry_after))
+                            await asyncio.sleep(delay)
+                            continue
+                        if r.status == 400:
+                            # Binance не знает такую пару
+                            return
+                        r.raise_for_status()
+                        result_dict = await r.json()
+                        if 'asks' not in result_dict or not result_dict['asks']:
+                            return
+                        price = float(result_dict['asks'][0][0])
+                        cls._quotes[symbol] = (price, time.monotonic())
+                        return price
+                except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                    last_error = repr(err)
+                    await asyncio.sleep(delay)
+            raise ValueError(f"Can`t get {symbol} price | Binance: {last_error} after {cls.retries} attempts")
+        finally:
+            cls._requests.pop(symbol, None)
+
+    @classmethod
+    async def _listen(cls, symbols: list[str]) -> None:
+        streams = '/'.join(f'{symbol.lower()}@bookTicker' for symbol in symbols)
+        while True:
+            try:
+                async with cls._get_session().ws_connect(f'{cls.ws_url}/stream?streams={streams}',
+                                                         heartbeat=30) as ws:
+                    async for message in ws:
+                        if message.type != aiohttp.WSMsgType.TEXT:
+                            continue
+                        data = json.loads(message.data).get('data', {})
+                        if data.get('s') and data.get('a'):
+                            cls._quotes[data['s']] = (float(data['a']), time.monotonic())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            # соединение оборвалось, переподключаемся
+            await asyncio.sleep(1)
+
+
+# сессия и websocket цен закрываются вместе с пулами клиентов
+Client.on_close(PriceFeed.close)
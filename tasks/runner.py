@@ -0,0 +1,161 @@
+import time
+import random
+import asyncio
+import inspect
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+
+from eth_async.client import Client
+from eth_async.models import Network, Networks
+
+
+Key = str | tuple[str, str | None]  # private key или (private key, proxy)
+
+_DONE = object()
+
+
+class WalletResult:
+    def __init__(self, address: str | None, result: Any = None, error: Exception | None = None,
+                 attempts: int = 0, elapsed: float = 0) -> None:
+        self.address = address
+        self.result = result
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self) -> str:
+        status = self.result if self.ok else f'ERROR: {self.error!r}'
+        return f'{self.address} | attempts: {self.attempts} | {self.elapsed:.1f}s | {status}'
+
+
+class Runner:
+    """
+    Runs a task for many wallets with a global concurrency cap and a per-RPC cap.
+
+    The task is an async callable taking a Client, ex. `lambda client: Mute(client).swap_eth_to_usdc(amount)`.
+    `rpc_concurrency` caps how many wallets run the task against one RPC at a time (not single requests),
+    Runners with the same RPC and the same cap share it. Each finished wallet is passed to `sink` (sync or async
+    callable) as soon as it is done, an exception from the sink is stored as the wallet's error.
+    """
+    _rpc_semaphores: dict[tuple[str, int], asyncio.Semaphore] = {}
+
+    def __init__(self,
+                 task: Callable[[Client], Awaitable[Any]],
+                 network: Network = Networks.Arbitrum,
+                 concurrency: int = 50,
+                 rpc_concurrency: int = 20,
+                 jitter: tuple[float, float] = (0, 0),
+                 retries: int = 2,
+                 retry_delay: float = 5,
+                 check_proxy: bool = False,
+                 sink: Callable[[WalletResult], Any] | None = None) -> None:
+        self.task = task
+        self.network = network
+        self.concurrency = concurrency
+        self.rpc_concurrency = rpc_concurrency
+        self.jitter = jitter
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.check_proxy = check_proxy
+        self.sink = sink
+
+    @property
+    def rpc_semaphore(self) -> asyncio.Semaphore:
+        # общий на все Runner, которые ходят в один и тот же RPC с тем же лимитом
+        key = (self.network.rpc, self.rpc_concurrency)
+        if key not in self._rpc_semaphores:
+            self._rpc_semaphores[key] = asyncio.Semaphore(self.rpc_concurrency)
+        return self._rpc_semaphores[key]
+
+    async def run(self, keys: Iterable[Key] | AsyncIterable[Key]) -> list[WalletResult]:
+        """Run the task for all keys and return results in completion order."""
+        return [result async for result in self.stream(keys)]
+
+    async def stream(self, keys: Iterable[Key] | AsyncIterable[Key]) -> AsyncIterator[WalletResult]:
+        """Run the task for all keys, yielding each result as soon as the wallet is finished."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def stop_workers() -> None:
+            for _ in range(self.concurrency):
+                await queue.put(_DONE)
+
+        async def produce() -> None:
+            try:
+                if isinstance(keys, AsyncIterable):
+                    async for key in keys:
+                        await queue.put(key)
+                else:
+                    for key in keys:
+                        await queue.put(key)
+            except asyncio.CancelledError:
+                # stream закрыт, воркеры отменены, и ждать места в очереди бесполезно
+                raise
+            except Exception:
+                # воркеры дорабатывают ключи из очереди, ошибка источника всплывет из stream
+                await stop_workers()
+                raise
+            await stop_workers()
+
+        async def work() -> None:
+            try:
+                while (key := await queue.get()) is not _DONE:
+                    result = await self._run_wallet(key)
+                    if self.sink:
+                        try:
+                            sunk = self.sink(result)
+                            if inspect.isawaitable(sunk):
+                                await sunk
+                        except Exception as err:
+                            # результат кошелька не теряем, но и успешным его не считаем
+                            result.error = result.error or err
+                    await results.put(result)
+            finally:
+                results.put_nowait(None)
+
+        producer = asyncio.create_task(produce())
+        tasks = [producer] + [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        try:
+            finished = 0
+            while finished < self.concurrency:
+                result = await results.get()
+                if result is None:
+                    finished += 1
+                    continue
+                yield result
+            await producer
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_wallet(self, key: Key) -> WalletResult:
+        private_key, proxy = key if isinstance(key, tuple) else (key, None)
+        started = time.monotonic()
+        wallet_result = WalletResult(address=None)
+        try:
+            client = Client(private_key=private_key, network=self.network, proxy=proxy, check_proxy=self.check_proxy)
+        except Exception as err:
+            wallet_result.error = err
+            return wallet_result
+
+        wallet_result.address = client.account.address
+        for attempt in range(1, self.retries + 2):
+            wallet_result.attempts = attempt
+            if self.jitter[1]:
+                await asyncio.sleep(random.uniform(*self.jitter))
+            try:
+                async with self.rpc_semaphore:
+                    wallet_result.result = await self.task(client)
+                wallet_result.error = None
+                break
+            except Exception as err:
+                wallet_result.error = err
+                if attempt <= self.retries:
+                    await asyncio.sleep(self.retry_delay)
+
+        wallet_result.elapsed = time.monotonic() - started
+        return wallet_result
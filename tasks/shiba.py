@@ -16,10 +16,11 @@ class Shiba(Base):
         from_token = Contracts.ETHEREUM_ETH
         to_token = Contracts.ETHEREUM_USDC
 
-        eth_price = await self.get_token_price(token_symbol='ETH')
-        min_to_amount = TokenAmount(
-            amount=eth_price * float(amount.Ether) * (1 - slippage / 100),
-            decimals=await self.client.transactions.get_decimals(contract=to_token)
+        min_to_amount = await self.get_amount_out_min(
+            router=Contracts.ETHEREUM_SHIBASWAP,
+            amount=amount,
+            path=[from_token, to_token],
+            slippage=slippage
         )
         deadline = int(time()) + 600  # 10 минут с текущего момента
 
@@ -36,11 +37,12 @@ class Shiba(Base):
             value=amount.Wei
         )
 
+        # без шаблона газ оценивается для каждого кошелька, это и есть проверка, что свап пройдет
         await self.client.transactions.auto_add_params(tx_params=tx_params)
 
-        gas = await self.client.transactions.estimate_gas(tx_params=tx_params)
+        gas = tx_params['gas']
         if gas:
-            return f'{amount.Ether} ETH was swaped to {min_to_amount.Ether} USDC via Shiba: {gas.Wei}'
+            return f'{amount.Ether} ETH was swaped to {min_to_amount.Ether} USDC via Shiba: {gas}'
 
         return f'{failed_text}'
 